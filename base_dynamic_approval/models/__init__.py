@@ -6,3 +6,5 @@ from . import dynamic_approval_request
 from . import dynamic_approval_mixin
 from . import res_config_settings
 from . import resource_calendar
+from . import res_groups
+from . import res_users
@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 from odoo import fields, models, api
 from odoo.tools import safe_eval
 import datetime
@@ -142,48 +143,74 @@ class DynamicApproval(models.Model):
     def is_matched_approval(self, res):
         """ return True / False based on approval match record condition """
         self.ensure_one()
-        for condition in self.approval_condition_ids:
-            if not condition.is_condition_matched(res=res):
-                return False
-        return True
+        return bool(self.approval_condition_ids._filter_matched_records(res))
 
     def _prepare_approval_request_values(self, model, res):
-        """ return values for approval request """
+        """ return values for approval requests of records res, level domains are evaluated once for all records """
         self.ensure_one()
-        levels = []
         evaluation_context = {
             'datetime': safe_eval.datetime,
             'context_today': datetime.datetime.now,
         }
+        level_record_ids = []
         for level in self.approval_level_ids:
             if level.apply_domain:
                 domain = safe_eval.safe_eval(level.domain or '[]', evaluation_context)
-                orders = self.env[self.model].search(domain)
-                if res in orders:
-                    levels.append(level)
+                level_record_ids.append((level, set(res.filtered_domain(domain).ids)))
             else:
-                levels.append(level)
+                level_record_ids.append((level, set(res.ids)))
 
-        return [level.prepare_approval_request_values(model=model, res=res) for level in levels]
+        return [level.prepare_approval_request_values(model=model, res=record)
+                for record in res
+                for level, record_ids in level_record_ids if record.id in record_ids]
+
+    @api.model
+    def _get_matched_approvals(self, model, records, company=None):
+        """
+        return {record id: approval} for records that match an approval,
+        candidate approvals are searched once per company and state
+        """
+        record_ids_by_key = defaultdict(list)
+        for record in records:
+            record_company = company or getattr(record, record._company_field)
+            record_ids_by_key[(record_company.id, getattr(record, record._state_field))].append(record.id)
+        matched_approvals = {}
+        for (company_id, state_from), record_ids in record_ids_by_key.items():
+            approvals = self.sudo().search(
+                [('model', '=', model), '|',
+                 ('company_id', '=', company_id), ('company_id', '=', False),
+                 ('state_from', '=', state_from)
+                 ],
+                order='sequence ASC')
+            remaining = records.browse(record_ids)
+            for approval in approvals:
+                matched = approval.approval_condition_ids._filter_matched_records(remaining)
+                matched_approvals.update(dict.fromkeys(matched.ids, approval))
+                remaining -= matched
+                if not remaining:
+                    break
+        return matched_approvals
+
+    @api.model
+    def action_set_approvers(self, model, records):
+        """ create approval requests of all records matching an approval, return {record id: approval} """
+        matched_approvals = self._get_matched_approvals(model, records)
+        record_ids_by_approval = defaultdict(list)
+        for record in records:
+            if record.id in matched_approvals:
+                record_ids_by_approval[matched_approvals[record.id]].append(record.id)
+        approval_request_values = []
+        for approval, record_ids in record_ids_by_approval.items():
+            approval_request_values += approval._prepare_approval_request_values(model, records.browse(record_ids))
+        if approval_request_values:
+            self.env['dynamic.approval.request'].create(approval_request_values)
+        return matched_approvals
 
     @api.model
     def action_set_approver(self, model, res, company):
         """ return approval match record condition """
-        state_field = res._state_field
-        state_from = getattr(res, state_field)
-        approvals = self.sudo().search(
-            [('model', '=', model), '|',
-             ('company_id', '=', company.id), ('company_id', '=', False),
-             ('state_from', '=', state_from)
-             ],
-            order='sequence ASC')
-        matched_approval = self.env['dynamic.approval']
-        for approval in approvals:
-            if approval.is_matched_approval(res=res):
-                matched_approval = approval
-                break
+        matched_approval = self._get_matched_approvals(model, res, company=company).get(res.id, self.browse())
         if matched_approval:
             approval_request_values = matched_approval._prepare_approval_request_values(model, res)
-            requests = self.env['dynamic.approval.request'].create(approval_request_values)
-            # add try to make sure that user inherit dynamic.approval.mixin
+            self.env['dynamic.approval.request'].create(approval_request_values)
         return matched_approval
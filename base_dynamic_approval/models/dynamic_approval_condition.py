@@ -1,10 +1,26 @@
+import ast
 import logging
 import datetime
-from odoo import api, fields, models
+import operator
+from operator import attrgetter
+from odoo import api, fields, models, tools
 from odoo.tools import safe_eval
 
 _logger = logging.getLogger(__name__)
 
+OPERATORS = {
+    '==': operator.eq,
+    '<=': operator.le,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '>': operator.gt,
+}
+
+# fields of a condition its evaluator is compiled from
+EVALUATOR_FIELDS = (
+    'condition_type', 'field_name', 'operator', 'value_type', 'value', 'filter_domain', 'python_code',
+)
+
 
 class ApprovalCondition(models.Model):
     _name = 'dynamic.approval.condition'
@@ -90,63 +106,109 @@ class ApprovalCondition(models.Model):
         for record in self:
             record.value = False
 
-    def _is_condition_matched_field_selection(self, res):
-        """ return true / false based on calculation type """
+    def _get_evaluator_definition(self):
+        """ values the evaluator of the condition is compiled from, part of its cache key
+            so that a changed condition is compiled again without clearing any cache
+        """
         self.ensure_one()
-        value_compare = self.value
-        eval_dict = {'record': res}
+        return tuple(self[field_name] or False for field_name in EVALUATOR_FIELDS)
+
+    @api.model
+    @tools.ormcache('condition_id', 'definition')
+    def _get_condition_evaluator(self, condition_id, definition):
+        """ compile condition once into a function filtering a recordset on it,
+            cached per condition and definition
+        """
+        condition = self.browse(condition_id)
+        compile_method = getattr(condition, '_compile_%s' % condition.condition_type, None)
+        if not compile_method:
+            return lambda records: records.browse()
         try:
-            field_name_value = safe_eval.safe_eval('record.' + str(self.field_name), eval_dict)
-            if self.value_type == 'dynamic':
-                value_compare = safe_eval.safe_eval('record.' + str(value_compare), eval_dict)
-            test = safe_eval.safe_eval(str(field_name_value) + self.operator + str(value_compare))
+            return compile_method()
         except Exception as e:
-            _logger.warning(e)
-            test = False
-        return test
+            _logger.warning('Approval condition <%s> can not be compiled: %s', condition.id, e)
+            return lambda records: records.browse()
 
-    def _is_codition_matched_domain(self, res):
-        """ return true / false based on calculation type """
+    def _compile_field_selection(self):
+        """ resolve field paths to getters and operator to function """
         self.ensure_one()
-        evaluation_context = {
-            'datetime': safe_eval.datetime,
-            'context_today': datetime.datetime.now,
-        }
-        try:
-            domain = safe_eval.safe_eval(self.filter_domain or '[]', evaluation_context)
-            domain.extend([('id', 'in', res.ids)])
-            data = self.env[self.model].search(domain)
-            test = True if data else False
-        except Exception as e:
-            _logger.warning(e)
-            test = False
-        return test
+        get_field_value = attrgetter(self.field_name)
+        compare = OPERATORS[self.operator]
+        if self.value_type == 'dynamic':
+            get_value_compare = attrgetter(self.value)
+        else:
+            value_compare = ast.literal_eval(str(self.value))
+            get_value_compare = lambda record: value_compare
+
+        def is_matched(record):
+            try:
+                field_name_value = get_field_value(record)
+                value_compare = get_value_compare(record)
+                # related records have no literal value to compare
+                if isinstance(field_name_value, models.BaseModel) or isinstance(value_compare, models.BaseModel):
+                    return False
+                return compare(field_name_value, value_compare)
+            except Exception as e:
+                _logger.warning(e)
+                return False
+        return lambda records: records.filtered(is_matched)
 
-    def _is_codition_matched_python_code(self, res):
-        """ return true / false based on calculation type """
+    def _compile_domain(self):
+        """ evaluate domain in memory, literal domains are parsed only once """
         self.ensure_one()
+        filter_domain = self.filter_domain or '[]'
         try:
-            localdict = {
-                'datetime': safe_eval.datetime,
-                'dateutil': safe_eval.dateutil,
-                'time': safe_eval.time,
-                'context_today': datetime.datetime.now,
-                'user': self.env.user,
-                'record': res,
-            }
-            safe_eval.safe_eval(self.python_code, localdict, mode="exec", nocopy=True)
-            test = localdict['result']
-        except Exception as e:
-            _logger.warning(e)
-            test = False
-        return test
+            domain = ast.literal_eval(filter_domain)
+        except (ValueError, SyntaxError):
+            domain = None
+
+        def filter_records(records):
+            try:
+                evaluation_context = {
+                    'datetime': safe_eval.datetime,
+                    'context_today': datetime.datetime.now,
+                }
+                return records.filtered_domain(
+                    domain if domain is not None else safe_eval.safe_eval(filter_domain, evaluation_context))
+            except Exception as e:
+                _logger.warning(e)
+                return records.browse()
+        return filter_records
+
+    def _compile_python_code(self):
+        """ python code is checked once, safe_eval does not accept precompiled code so it runs per record """
+        self.ensure_one()
+        python_code = self.python_code or ''
+        error = safe_eval.test_python_expr(python_code, mode='exec')
+        if error:
+            raise ValueError(error)
+
+        def is_matched(record):
+            try:
+                localdict = {
+                    'datetime': safe_eval.datetime,
+                    'dateutil': safe_eval.dateutil,
+                    'time': safe_eval.time,
+                    'context_today': datetime.datetime.now,
+                    'user': record.env.user,
+                    'record': record,
+                }
+                safe_eval.safe_eval(python_code, localdict, mode="exec", nocopy=True)
+                return localdict['result']
+            except Exception as e:
+                _logger.warning(e)
+                return False
+        return lambda records: records.filtered(is_matched)
+
+    def _filter_matched_records(self, records):
+        """ return records matching all conditions in self """
+        for condition in self:
+            if not records:
+                break
+            records = self._get_condition_evaluator(condition.id, condition._get_evaluator_definition())(records)
+        return records
 
     def is_condition_matched(self, res):
         """ check if condition is matched with record """
         self.ensure_one()
-        if self.condition_type == 'field_selection':
-            return self._is_condition_matched_field_selection(res)
-        elif self.condition_type == 'domain':
-            return self._is_codition_matched_domain(res)
-        elif self.condition_type == 'python_code':
-            return self._is_codition_matched_python_code(res)
+        return bool(self._filter_matched_records(res))
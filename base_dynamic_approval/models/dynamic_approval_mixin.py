@@ -1,3 +1,4 @@
+from collections import defaultdict
 from datetime import datetime
 import logging
 from odoo import _, fields, models
@@ -26,6 +27,7 @@ class DynamicApprovalMixin(models.AbstractModel):
     )
     dynamic_approve_pending_group = fields.Boolean(
         compute='_compute_dynamic_approve_pending_group',
+        search='_search_dynamic_approve_pending_group',
     )
     approve_requester_id = fields.Many2one(
         comodel_name='res.users',
@@ -48,6 +50,7 @@ class DynamicApprovalMixin(models.AbstractModel):
     def compute_is_dynamic_approval_requester(self):
         """ return true if current user is who submit approval """
         current_user = self.env.user
+        is_approval_user = current_user.has_group('base_dynamic_approval.dynamic_approval_user_group')
         for record in self:
             is_dynamic_approval_requester = False
             if record.approve_requester_id and current_user == record.approve_requester_id:
@@ -56,7 +59,7 @@ class DynamicApprovalMixin(models.AbstractModel):
                 is_dynamic_approval_requester = True
             elif getattr(record, self._reset_user) == current_user:
                 is_dynamic_approval_requester = True
-            elif self.env.user.has_group('base_dynamic_approval.dynamic_approval_user_group'):
+            elif is_approval_user:
                 is_dynamic_approval_requester = True
             record.is_dynamic_approval_requester = is_dynamic_approval_requester
 
@@ -79,28 +82,66 @@ class DynamicApprovalMixin(models.AbstractModel):
             record.is_second_dynamic_approval_requester = is_second_dynamic_approval_requester
 
     def _compute_dynamic_approve_pending_group(self):
+        is_approval_user = self.env.user.has_group('base_dynamic_approval.dynamic_approval_user_group')
+        pend_approve_requests = self.dynamic_approve_request_ids.filtered(
+            lambda approver: approver.status == 'pending')
+        approve_user_ids = pend_approve_requests._get_approve_user_ids_by_request()
         for record in self:
             dynamic_approve_pending_group = False
-            pend_approve_requests = record.dynamic_approve_request_ids.filtered(
+            record_pend_approve_requests = record.dynamic_approve_request_ids.filtered(
                 lambda approver: approver.status == 'pending')
-            if pend_approve_requests:
-                if self.env.user.has_group('base_dynamic_approval.dynamic_approval_user_group'):
+            if record_pend_approve_requests:
+                if is_approval_user:
+                    dynamic_approve_pending_group = True
+                elif any(self.env.uid in approve_user_ids[request.id] for request in record_pend_approve_requests):
                     dynamic_approve_pending_group = True
-                else:
-                    if self.env.user in pend_approve_requests.get_approve_user():
-                        dynamic_approve_pending_group = True
             record.dynamic_approve_pending_group = dynamic_approve_pending_group
 
+    def _search_dynamic_approve_pending_group(self, operator, value):
+        """ records having a pending approval request the current user can approve """
+        if operator not in ('=', '!=') or not isinstance(value, bool):
+            raise UserError(_('Operation not supported'))
+        request_domain = [('status', '=', 'pending')]
+        if not self.env.user.has_group('base_dynamic_approval.dynamic_approval_user_group'):
+            request_domain.append(('approver_user_ids', 'in', self.env.uid))
+        positive = (operator == '=') == value
+        return [('dynamic_approve_request_ids', 'any' if positive else 'not any', request_domain)]
+
     def _notify_next_approval_request(self, matched_approval, user):
         """ notify next approval """
         self.ensure_one()
         if matched_approval.need_create_activity_to_approve:
             self._create_approve_activity(user)
         if matched_approval.email_template_to_approve_id and user != self.env.user:
-            email_values = {'email_to': user.email, 'email_from': self.env.user.email}
-            self.dynamic_approval_id.email_template_to_approve_id.with_context(
-                name_to=user.name, user_lang=user.lang).send_mail(
-                self.id, email_values=email_values, force_send=True)
+            self._send_approval_email(self.dynamic_approval_id.email_template_to_approve_id, user)
+
+    def _send_approval_email(self, template, user, **context):
+        """
+        queue approval email of template to user, emails are rendered in bulk per template and user
+        right before the transaction is committed and delivered afterwards by the mail queue
+        """
+        self.ensure_one()
+        precommit = self.env.cr.precommit
+        approval_emails = precommit.data.get('base_dynamic_approval.emails')
+        if approval_emails is None:
+            approval_emails = precommit.data['base_dynamic_approval.emails'] = defaultdict(list)
+            precommit.add(self._flush_approval_emails)
+        key = (self._name, template.id, user.id, self.env.user.id, tuple(sorted(context.items())))
+        approval_emails[key].append(self.id)
+
+    def _flush_approval_emails(self):
+        """ render queued approval emails with one batch per template and user """
+        approval_emails = self.env.cr.precommit.data.pop('base_dynamic_approval.emails', {})
+        for (_model, template_id, user_id, author_id, context), res_ids in approval_emails.items():
+            template = self.env['mail.template'].browse(template_id)
+            user = self.env['res.users'].browse(user_id)
+            email_values = {'email_to': user.email, 'email_from': self.env['res.users'].browse(author_id).email}
+            template.with_context(name_to=user.name, user_lang=user.lang, **dict(context)).send_mail_batch(
+                list(dict.fromkeys(res_ids)), email_values=email_values)
+        if approval_emails:
+            self.env.ref('mail.ir_cron_mail_scheduler_action')._trigger()
+        # the hook runs after the final flush of the transaction
+        self.env.flush_all()
 
     def _create_approve_activity(self, user):
         """ create activity based on next user """
@@ -188,10 +229,7 @@ class DynamicApprovalMixin(models.AbstractModel):
             users_to_send = self.env['res.users'].browse(users_to_send.mapped('id'))
             for user in users_to_send:
                 if user != self.env.user and user.email:
-                    email_values = {'email_to': user.email, 'email_from': self.env.user.email}
-                    self.dynamic_approval_id.email_template_after_final_approve_id.with_context(
-                        name_to=user.name, user_lang=user.lang).send_mail(self.id, email_values=email_values,
-                                                                          force_send=True)
+                    self._send_approval_email(self.dynamic_approval_id.email_template_after_final_approve_id, user)
         if self.dynamic_approval_id and self.dynamic_approval_id.after_final_approve_server_action_id:
             action = self.dynamic_approval_id.after_final_approve_server_action_id.with_context(
                 active_model=self._name,
@@ -238,9 +276,11 @@ class DynamicApprovalMixin(models.AbstractModel):
         """ return list of approval requests that need to approve """
         self.ensure_one()
         pending_approval_ids = []
-        for request in self.dynamic_approve_request_ids.filtered(
-                lambda request_approve: request_approve.status in ['pending', 'new']):
-            if user in request.get_approve_user():
+        requests = self.dynamic_approve_request_ids.filtered(
+            lambda request_approve: request_approve.status in ['pending', 'new'])
+        approve_user_ids = requests._get_approve_user_ids_by_request()
+        for request in requests:
+            if user.id in approve_user_ids[request.id]:
                 pending_approval_ids.append(request.id)
             else:
                 break
@@ -297,20 +337,17 @@ class DynamicApprovalMixin(models.AbstractModel):
                     users_to_send = self.env['res.users'].browse(users_to_send.mapped('id'))
                     for user in users_to_send:
                         if user != self.env.user and user.email:
-                            email_values = {'email_to': user.email, 'email_from': self.env.user.email}
-                            record.dynamic_approval_id.rejection_email_template_id.with_context(
-                                name_to=user.name, user_lang=user.lang, reject_reason=reason).send_mail(
-                                record.id, email_values=email_values, force_send=True)
+                            record._send_approval_email(
+                                record.dynamic_approval_id.rejection_email_template_id, user, reject_reason=reason)
                 # send email template to users who approved to record before about rejection
                 if record.dynamic_approval_id and record.dynamic_approval_id.need_notify_rejection_approved_user and \
                         record.dynamic_approval_id.rejection_email_template_id:
                     approved_users = approved_requests.mapped('approved_by')
                     for approved_user in approved_users:
                         if approved_user != self.env.user and approved_user.email:
-                            email_values = {'email_to': approved_user.email, 'email_from': self.env.user.email}
-                            record.dynamic_approval_id.rejection_email_template_id.with_context(
-                                name_to=approved_user.name, user_lang=user.lang, reject_reason=reason). \
-                                send_mail(record.id, email_values=email_values, force_send=True)
+                            record._send_approval_email(
+                                record.dynamic_approval_id.rejection_email_template_id, approved_user,
+                                reject_reason=reason)
                 # run server action
                 if record.dynamic_approval_id and record.dynamic_approval_id.rejection_server_action_id:
                     action = self.dynamic_approval_id.rejection_server_action_id.with_context(
@@ -354,20 +391,17 @@ class DynamicApprovalMixin(models.AbstractModel):
                     users_to_send = self.env['res.users'].browse(users_to_send.mapped('id'))
                     for user in users_to_send:
                         if user != self.env.user and user.email:
-                            email_values = {'email_to': user.email, 'email_from': self.env.user.email}
-                            record.dynamic_approval_id.recall_email_template_id.with_context(
-                                name_to=user.name, user_lang=user.lang, recall_reason=reason).send_mail(
-                                record.id, email_values=email_values, force_send=True)
+                            record._send_approval_email(
+                                record.dynamic_approval_id.recall_email_template_id, user, recall_reason=reason)
                 # send email template to users who approved to record before about recall
                 if record.dynamic_approval_id and record.dynamic_approval_id.need_notify_recall_approved_user and \
                         record.dynamic_approval_id.recall_email_template_id:
                     approved_users = approved_requests.mapped('approved_by')
                     for approved_user in approved_users:
                         if approved_user != self.env.user and approved_user.email:
-                            email_values = {'email_to': approved_user.email, 'email_from': self.env.user.email}
-                            record.dynamic_approval_id.recall_email_template_id.with_context(
-                                name_to=approved_user.name, user_lang=user.lang, recall_reason=reason). \
-                                send_mail(record.id, email_values=email_values, force_send=True)
+                            record._send_approval_email(
+                                record.dynamic_approval_id.recall_email_template_id, approved_user,
+                                recall_reason=reason)
 
                 # run server action
                 if record.dynamic_approval_id and record.dynamic_approval_id.recall_server_action_id:
@@ -390,47 +424,41 @@ class DynamicApprovalMixin(models.AbstractModel):
     # actions workflow
     def action_dynamic_approval_request(self):
         """
-        search for advanced approvals that match current record and add approvals
-        if record does not match then appear wizard to confirm order without approval
+        search for advanced approvals that match current records and add approvals
+        if a record does not match then appear wizard to confirm order without approval
         """
-        for record in self:
-            company = getattr(record, self._company_field)
-            # if getattr(record, record._state_field) in self.dynamic_approval_id.state_from:
-            if record.dynamic_approve_request_ids:
-                record.remove_approval_requests(all=False)
-                # mark any old activity as done to allow create new activity
-                activity = record._get_user_approval_activities()
-                if activity:
-                    activity.action_feedback()
-            matched_approval = self.env['dynamic.approval'].action_set_approver(model=self._name, res=record,
-                                                                                company=company)
-            if matched_approval:
-                record.write({
-                    self._state_field: matched_approval.state_under_approval,
-                    'approve_requester_id': self.env.user.id,
-                    'dynamic_approval_id': matched_approval.id,
-                    'state_from_name': getattr(record, record._state_field),
-                })
-                next_waiting_approval = record.dynamic_approve_request_ids.sorted(lambda x: (x.sequence, x.id))[0]
-                next_waiting_approval.status = 'pending'
-                if next_waiting_approval.get_approve_user():
-                    user = next_waiting_approval.get_approve_user()[0]
-                    record._notify_next_approval_request(matched_approval, user)
-                # if next_waiting_approval and self.approve_requester_id:
-                #     val = {'user_id': self.env.uid,
-                #            'status': 'request_approval',
-                #            'action_date': datetime.now(),
-                #            'sale_id': self.id,
-                #            'sale_order_status': self.state,
-                #            }
-                #     self.approval_history_ids.create(val)
-            else:
-                if self._not_matched_action_xml_id:
-                    action_id = self._not_matched_action_xml_id
-                    action = self.env["ir.actions.actions"]._for_xml_id(action_id)
-                    return action
-            # else:
-            #     raise UserError(_('This status is not allowed to request approval'))
+        records_with_requests = self.filtered('dynamic_approve_request_ids')
+        for record in records_with_requests:
+            record.remove_approval_requests(all=False)
+        # mark any old activity as done to allow create new activity
+        activity = records_with_requests._get_user_approval_activities()
+        if activity:
+            activity.action_feedback()
+        matched_approvals = self.env['dynamic.approval'].action_set_approvers(model=self._name, records=self)
+        matched_records = self.filtered(lambda record: record.id in matched_approvals)
+        record_ids_by_approval = defaultdict(list)
+        for record in matched_records:
+            record_ids_by_approval[(matched_approvals[record.id], getattr(record, record._state_field))].append(
+                record.id)
+        for (matched_approval, state_from), record_ids in record_ids_by_approval.items():
+            self.browse(record_ids).write({
+                self._state_field: matched_approval.state_under_approval,
+                'approve_requester_id': self.env.user.id,
+                'dynamic_approval_id': matched_approval.id,
+                'state_from_name': state_from,
+            })
+        next_waiting_approvals = self.env['dynamic.approval.request'].browse([
+            record.dynamic_approve_request_ids.sorted(lambda x: (x.sequence, x.id))[0].id
+            for record in matched_records
+        ])
+        next_waiting_approvals.write({'status': 'pending'})
+        for record, next_waiting_approval in zip(matched_records, next_waiting_approvals):
+            if next_waiting_approval.get_approve_user():
+                user = next_waiting_approval.get_approve_user()[0]
+                record._notify_next_approval_request(matched_approvals[record.id], user)
+        if len(matched_records) < len(self) and self._not_matched_action_xml_id:
+            action = self.env["ir.actions.actions"]._for_xml_id(self._not_matched_action_xml_id)
+            return action
 
     def action_under_approval(self, note=''):
         """
@@ -1,7 +1,7 @@
 import pytz
 from datetime import datetime, timedelta
 
-from odoo import api, models, fields
+from odoo import api, models, fields, tools
 
 
 class DynamicApprovalRequest(models.Model):
@@ -50,6 +50,7 @@ class DynamicApprovalRequest(models.Model):
             ('recall', 'recall')
         ],
         default="new",
+        index=True,
     )
     approved_by = fields.Many2one(
         comodel_name='res.users',
@@ -67,6 +68,15 @@ class DynamicApprovalRequest(models.Model):
         comodel_name='dynamic.approval.level',
         copy=False,
     )
+    approver_user_ids = fields.Many2many(
+        comodel_name='res.users',
+        relation='dynamic_approval_request_approver_rel',
+        column1='request_id',
+        column2='user_id',
+        string='Approvers',
+        compute='_compute_approver_user_ids',
+        store=True,
+    )
     approval_states = fields.Char(string='State Approval', compute='get_dynamic_approve_state_from', store=True)
     last_reminder_date = fields.Datetime()
 
@@ -83,21 +93,58 @@ class DynamicApprovalRequest(models.Model):
             else:
                 rec.approval_states = False
 
+    @api.depends('user_id', 'group_id', 'group_id.all_user_ids')
+    def _compute_approver_user_ids(self):
+        """ stored approvers, used to search records waiting for a user approval """
+        for record in self:
+            record.approver_user_ids = record.user_id | record.group_id.all_user_ids
+
     @api.depends('res_model', 'res_id')
     def _compute_res_name(self):
         """ appear display name of related document """
         for record in self:
             record.res_name = record.res_model and self.env[record.res_model].browse(record.res_id).display_name
 
-    def get_approve_user(self):
-        """ :return users that need to approve """
-        users = self.env['res.users']
+    @api.model
+    @tools.ormcache(cache='groups')
+    def _get_user_ids_by_group(self):
+        """ :return {group id: tuple of ids of the users of the group}, cached until group membership changes """
+        groups = self.env['res.groups'].sudo().search([])
+        return tools.frozendict((group.id, tuple(group.all_user_ids.ids)) for group in groups)
+
+    @api.model
+    def _get_group_user_ids(self, group_id):
+        """ return ids of the users of an approver group """
+        return self._get_user_ids_by_group().get(group_id, ())
+
+    @api.model
+    def _update_group_approvers(self, groups):
+        """ group members are not stored, clear the approvers cached by group and recompute the
+            stored approvers of the requests of groups after their members changed
+        """
+        self.env.registry.clear_cache('groups')
+        if not groups:
+            return
+        groups.invalidate_recordset(['all_user_ids'])
+        requests = self.sudo().search([('group_id', 'in', groups.ids)])
+        if requests:
+            self.env.add_to_compute(self._fields['approver_user_ids'], requests)
+
+    def _get_approve_user_ids_by_request(self):
+        """ :return {request id: tuple of ids of users that need to approve} for all requests in self """
+        res = {}
         for record in self:
-            if record.user_id:
-                users |= record.user_id
+            user_ids = [record.user_id.id] if record.user_id else []
             if record.group_id:
-                users |= record.group_id.users
-        return users
+                user_ids += self._get_group_user_ids(record.group_id.id)
+            res[record.id] = tuple(dict.fromkeys(user_ids))
+        return res
+
+    def get_approve_user(self):
+        """ :return users that need to approve """
+        user_ids_by_request = self._get_approve_user_ids_by_request()
+        return self.env['res.users'].browse(list(dict.fromkeys(
+            user_id for record in self for user_id in user_ids_by_request[record.id])))
 
     def action_send_reminder_email(self):
         """ send email to user for each request """
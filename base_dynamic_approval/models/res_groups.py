@@ -0,0 +1,15 @@
+from odoo import models
+
+
+class ResGroups(models.Model):
+    _inherit = 'res.groups'
+
+    def write(self, vals):
+        """ approvers of approval requests are cached by group """
+        if 'user_ids' not in vals and 'implied_ids' not in vals:
+            return super().write(vals)
+        # users of a group are users of all the groups it implies
+        groups = self | self.all_implied_ids
+        res = super().write(vals)
+        self.env['dynamic.approval.request']._update_group_approvers(groups | self.all_implied_ids)
+        return res
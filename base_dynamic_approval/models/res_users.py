@@ -0,0 +1,28 @@
+from odoo import api, models
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """ approvers of approval requests are cached by group """
+        users = super().create(vals_list)
+        self.env['dynamic.approval.request']._update_group_approvers(users.all_group_ids)
+        return users
+
+    def write(self, vals):
+        """ approvers of approval requests are cached by group """
+        if 'group_ids' not in vals and 'active' not in vals:
+            return super().write(vals)
+        groups = self.all_group_ids
+        res = super().write(vals)
+        self.env['dynamic.approval.request']._update_group_approvers(groups | self.all_group_ids)
+        return res
+
+    def unlink(self):
+        """ approvers of approval requests are cached by group """
+        groups = self.all_group_ids
+        res = super().unlink()
+        self.env['dynamic.approval.request']._update_group_approvers(groups)
+        return res
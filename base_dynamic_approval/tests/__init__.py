@@ -0,0 +1,2 @@
+from . import test_dynamic_approval_request
+from . import test_dynamic_approval_condition
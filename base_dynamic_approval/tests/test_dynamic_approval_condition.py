@@ -0,0 +1,105 @@
+import datetime
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import safe_eval
+
+
+@tagged('post_install', '-at_install')
+class TestDynamicApprovalCondition(TransactionCase):
+    """Test cases for the compiled evaluators of approval conditions"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.approval = cls.env['dynamic.approval'].create({
+            'name': 'Approval Test Conditions',
+            'model_id': cls.env['ir.model']._get_id('res.partner'),
+        })
+        cls.partners = cls.env['res.partner'].create([
+            {'name': 'Alpha Test Partner', 'color': 1},
+            {'name': 'Alpha Test Partner 2', 'color': 5},
+            {'name': 'Beta Test Partner', 'color': 7},
+            {'name': 'Beta Test Partner 2', 'color': 0},
+        ])
+
+    def _create_condition(self, values):
+        return self.env['dynamic.approval.condition'].create(dict(values, approval_id=self.approval.id))
+
+    def _is_matched_by_search(self, condition, partner):
+        """ evaluate the condition the way it was before being compiled, with a search for domains """
+        evaluation_context = {
+            'datetime': safe_eval.datetime,
+            'context_today': datetime.datetime.now,
+        }
+        try:
+            if condition.condition_type == 'field_selection':
+                eval_dict = {'record': partner}
+                field_name_value = safe_eval.safe_eval('record.' + condition.field_name, eval_dict)
+                value_compare = condition.value
+                if condition.value_type == 'dynamic':
+                    value_compare = safe_eval.safe_eval('record.' + value_compare, eval_dict)
+                return safe_eval.safe_eval(str(field_name_value) + condition.operator + str(value_compare))
+            if condition.condition_type == 'domain':
+                domain = safe_eval.safe_eval(condition.filter_domain or '[]', evaluation_context)
+                return bool(self.env['res.partner'].search(domain + [('id', 'in', partner.ids)]))
+            localdict = dict(evaluation_context, record=partner, user=self.env.user,
+                             dateutil=safe_eval.dateutil, time=safe_eval.time)
+            safe_eval.safe_eval(condition.python_code, localdict, mode='exec', nocopy=True)
+            return localdict['result']
+        except Exception:
+            return False
+
+    def _assert_same_as_search(self, condition):
+        expected = self.partners.filtered(lambda partner: self._is_matched_by_search(condition, partner))
+        self.assertEqual(condition._filter_matched_records(self.partners), expected)
+        for partner in self.partners:
+            self.assertEqual(condition.is_condition_matched(partner), partner in expected)
+        return expected
+
+    def test_01_fixed_value_condition(self):
+        """Test a field selection with a fixed value matches the same records as before"""
+        condition = self._create_condition({
+            'condition_type': 'field_selection',
+            'field_name': 'color',
+            'operator': '>=',
+            'value_type': 'fixed',
+            'value': '5',
+        })
+        self.assertEqual(self._assert_same_as_search(condition), self.partners[1:3])
+        condition.operator = '<'
+        self.assertEqual(self._assert_same_as_search(condition), self.partners[0] | self.partners[3])
+
+    def test_02_domain_condition(self):
+        """Test a domain applied in memory matches the same records as a search"""
+        condition = self._create_condition({
+            'condition_type': 'domain',
+            'filter_domain': "[('name', 'ilike', 'alpha'), ('color', '>', 2)]",
+        })
+        self.assertEqual(self._assert_same_as_search(condition), self.partners[1])
+        condition.filter_domain = "['|', ('name', '=like', 'Beta%'), ('create_date', '>', datetime.datetime(2000, 1, 1))]"
+        self.assertEqual(self._assert_same_as_search(condition), self.partners)
+        condition.filter_domain = "[('color', 'in', [0, 7])]"
+        self.assertEqual(self._assert_same_as_search(condition), self.partners[2:])
+
+    def test_03_python_code_condition(self):
+        """Test python code matches the same records as before"""
+        condition = self._create_condition({
+            'condition_type': 'python_code',
+            'python_code': "result = record.color > 2 and record.name.startswith('Beta')",
+        })
+        self.assertEqual(self._assert_same_as_search(condition), self.partners[2])
+        condition.python_code = "result = not record.color"
+        self.assertEqual(self._assert_same_as_search(condition), self.partners[3])
+
+    def test_04_conditions_filter_together(self):
+        """Test records must match all the conditions of an approval"""
+        conditions = self._create_condition({
+            'condition_type': 'domain',
+            'filter_domain': "[('name', 'ilike', 'partner 2')]",
+        }) | self._create_condition({
+            'condition_type': 'python_code',
+            'python_code': "result = record.color > 2",
+        })
+        self.assertEqual(conditions._filter_matched_records(self.partners), self.partners[1])
+        self.assertTrue(self.approval.is_matched_approval(self.partners[1]))
+        self.assertFalse(self.approval.is_matched_approval(self.partners[3]))
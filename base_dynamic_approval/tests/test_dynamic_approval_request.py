@@ -0,0 +1,91 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestDynamicApprovalRequest(TransactionCase):
+    """Test cases for the approvers of approval requests"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = cls.env['res.groups'].create({
+            'name': 'Approval Test Group',
+        })
+        cls.user = cls.env['res.users'].create({
+            'name': 'Approval Test User',
+            'login': 'approval_test_user',
+        })
+        cls.partner = cls.env['res.partner'].create({
+            'name': 'Approval Test Partner',
+        })
+        cls.request = cls.env['dynamic.approval.request'].create({
+            'res_model': 'res.partner',
+            'res_id': cls.partner.id,
+            'group_id': cls.group.id,
+            'status': 'pending',
+        })
+
+    def test_01_approver_user_ids_follow_group_members(self):
+        """Test stored approvers are recomputed when a user joins the group"""
+        self.assertNotIn(self.user, self.request.approver_user_ids)
+        self.group.write({'user_ids': [(4, self.user.id)]})
+        self.assertIn(self.user, self.request.approver_user_ids)
+
+    def test_02_cached_group_approvers_follow_group_members(self):
+        """Test approvers cached by group are refreshed when the group members change"""
+        self.assertNotIn(self.user, self.request.get_approve_user())
+        self.group.write({'user_ids': [(4, self.user.id)]})
+        self.assertIn(self.user, self.request.get_approve_user())
+        implying_group = self.env['res.groups'].create({
+            'name': 'Approval Test Implying Group',
+        })
+        implying_user = self.env['res.users'].create({
+            'name': 'Approval Test Implying User',
+            'login': 'approval_test_implying_user',
+            'group_ids': [(4, implying_group.id)],
+        })
+        self.assertNotIn(implying_user, self.request.get_approve_user())
+        implying_group.write({'implied_ids': [(4, self.group.id)]})
+        self.assertIn(implying_user, self.request.get_approve_user())
+
+    def test_03_flush_approval_emails(self):
+        """Test queued approval emails are rendered in one batch by the precommit hook"""
+        self.user.email = 'approval.test.user@example.com'
+        partner_2 = self.env['res.partner'].create({
+            'name': 'Approval Test Partner 2',
+        })
+        template = self.env['mail.template'].create({
+            'name': 'Approval Test Template',
+            'model_id': self.env['ir.model']._get_id('res.partner'),
+            'subject': 'Approve {{ object.name }}',
+            'body_html': '<p>Please approve</p>',
+        })
+        self.env.cr.precommit.data['base_dynamic_approval.emails'] = {
+            ('res.partner', template.id, self.user.id, self.env.uid, ()): [
+                self.partner.id, partner_2.id, self.partner.id],
+        }
+        self.env['dynamic.approval.mixin']._flush_approval_emails()
+        self.assertNotIn('base_dynamic_approval.emails', self.env.cr.precommit.data)
+        mails = self.env['mail.mail'].search([('mail_message_id.model', '=', 'res.partner'),
+                                              ('mail_message_id.res_id', 'in', (self.partner | partner_2).ids)])
+        self.assertEqual(len(mails), 2)
+        self.assertEqual(set(mails.mapped('email_to')), {'approval.test.user@example.com'})
+        self.assertEqual(set(mails.mapped('subject')),
+                         {'Approve Approval Test Partner', 'Approve Approval Test Partner 2'})
+
+    def test_04_approver_user_ids_follow_implied_groups(self):
+        """Test stored approvers are recomputed when users get the group through an implying group"""
+        implying_group = self.env['res.groups'].create({
+            'name': 'Approval Test Implying Group',
+        })
+        implying_user = self.env['res.users'].create({
+            'name': 'Approval Test Implying User',
+            'login': 'approval_test_implying_user',
+            'group_ids': [(4, implying_group.id)],
+        })
+        self.assertNotIn(implying_user, self.request.approver_user_ids)
+        self.assertNotIn(self.user, self.request.approver_user_ids)
+        implying_group.write({'implied_ids': [(4, self.group.id)]})
+        self.assertIn(implying_user, self.request.approver_user_ids)
+        self.user.write({'group_ids': [(4, implying_group.id)]})
+        self.assertIn(self.user, self.request.approver_user_ids)
@@ -58,54 +58,20 @@ class MrpProductionConsolidated(models.Model):
 
     def action_done(self):
         """Create native odoo separate MO records for each products from this consolidated MO"""
-        # Fields to exclude when copying to MO
-        EXCLUDE_FIELDS = {
-            'id', 'create_uid', 'create_date', 'write_uid', 'write_date', '__last_update',
-            'raw_material_production_id', 'state', 'component_product_id', 'price_unit',
-            'component_qty', 'production_group_id', 'use_create_components_lots'
-        }
-        # Field mappings from consolidated line to mrp.production (Odoo 19 compatibility)
-        FIELD_MAPPINGS = {
-            'date_planned_start': 'date_start',
-            'date_planned_finished': 'date_finished',
-        }
-
-        MrpProduction = self.env['mrp.production']
-        mo_valid_fields = set(MrpProduction._fields.keys())
-
+        production_lines = self.env['mrp.production.consolidated.line']
+        done_consolidations = self.browse()
         for rec in self:
             seen_products = set()
-            mo_values = []
             for line in rec.component_line_ids:
                 if line.product_id.id not in seen_products:
                     seen_products.add(line.product_id.id)
-
-                    # Prepare values list to create odoo native mrp records separate for each product
-                    data = {}
-
-                    for key, field in line._fields.items():
-                        if key in EXCLUDE_FIELDS:
-                            continue  # Exclude some fields
-
-                        value = getattr(line, key)
-
-                        # Map field name if needed
-                        target_key = FIELD_MAPPINGS.get(key, key)
-
-                        # Only include fields that exist on mrp.production
-                        if target_key not in mo_valid_fields:
-                            continue
-
-                        if isinstance(field, fields.Many2one):
-                            data[target_key] = value.id
-                        elif isinstance(field, fields.One2many) or isinstance(field, fields.Many2many):
-                            data[target_key] = [(6, 0, [r.id for r in value])]
-                        else:
-                            data[target_key] = value
-                    mo_values.append(data)
-            if mo_values:
-                self.env['stock.rule'].with_context(called_consolidated_mo=True)._run_manufacture(mo_values)
-                rec.state = 'done'
+                    production_lines |= line
+                    done_consolidations |= rec
+        # Prepare values list to create odoo native mrp records separate for each product
+        mo_values = production_lines._prepare_production_values()
+        if mo_values:
+            self.env['stock.rule'].with_context(called_consolidated_mo=True)._run_manufacture(mo_values)
+            done_consolidations.state = 'done'
 
     def action_view_mrp_production(self):
         self.ensure_one()
@@ -132,6 +98,18 @@ class MrpProductionConsolidatedLine(models.Model):
     _name = 'mrp.production.consolidated.line'
     _description = 'Production Order Consolidated Line'
 
+    # Fields to exclude when copying to MO
+    _production_excluded_fields = {
+        'id', 'create_uid', 'create_date', 'write_uid', 'write_date', '__last_update', 'display_name',
+        'raw_material_production_id', 'state', 'component_product_id', 'price_unit',
+        'component_qty', 'production_group_id', 'use_create_components_lots'
+    }
+    # Field mappings from consolidated line to mrp.production (Odoo 19 compatibility)
+    _production_field_mappings = {
+        'date_planned_start': 'date_start',
+        'date_planned_finished': 'date_finished',
+    }
+
     name = fields.Char("Name")
     origin = fields.Char(
         'Source', copy=False,
@@ -230,3 +208,28 @@ class MrpProductionConsolidatedLine(models.Model):
                                                                                          production.product_id.uom_id)
             else:
                 production.product_uom_qty = production.product_qty
+
+    @api.model
+    def _get_production_field_mapping(self):
+        """Return the (line field, mrp.production field) pairs copied to the MO"""
+        mo_valid_fields = self.env['mrp.production']._fields
+        return [
+            (name, self._production_field_mappings.get(name, name))
+            for name in self._fields
+            if name not in self._production_excluded_fields
+            and self._production_field_mappings.get(name, name) in mo_valid_fields
+        ]
+
+    def _prepare_production_values(self):
+        """Return the values of the MO of each line, read at once for all the lines"""
+        field_mapping = self._get_production_field_mapping()
+        mo_values = []
+        for line_values in self.read([name for name, _target in field_mapping], load=False):
+            data = {}
+            for name, target_key in field_mapping:
+                value = line_values[name]
+                if self._fields[name].type in ('one2many', 'many2many'):
+                    value = [Command.set(value)]
+                data[target_key] = value
+            mo_values.append(data)
+        return mo_values
@@ -19,34 +19,17 @@ class StockRule(models.Model):
         # If called from consolidated MO action_done, create native MOs directly
         if self._context.get('called_consolidated_mo'):
             # procurements here is a list of dict values for MO creation
-            productions = self.env['mrp.production']
+            productions_values_by_company = defaultdict(list)
             for productions_values in procurements:
-                company_id = productions_values.get('company_id')
-                # create the MO as SUPERUSER
-                production = self.env['mrp.production'].with_user(SUPERUSER_ID).sudo().with_company(company_id).create(
-                    productions_values)
-                production.action_confirm()
-                productions |= production
-
-            for production in productions:
-                origin_production = production.move_dest_ids and production.move_dest_ids[
-                    0].raw_material_production_id or False
-                orderpoint = production.orderpoint_id
-                if orderpoint and orderpoint.create_uid.id == SUPERUSER_ID and orderpoint.trigger == 'manual':
-                    production.message_post(
-                        body=_('This production order has been created from Replenishment Report.'),
-                        message_type='comment',
-                        subtype_xmlid='mail.mt_note')
-                elif orderpoint:
-                    production.message_post_with_source(
-                        'mail.message_origin_link',
-                        render_values={'self': production, 'origin': orderpoint},
-                        subtype_xmlid='mail.mt_note')
-                elif origin_production:
-                    production.message_post_with_source(
-                        'mail.message_origin_link',
-                        render_values={'self': production, 'origin': origin_production},
-                        subtype_xmlid='mail.mt_note')
+                productions_values_by_company[productions_values.get('company_id')].append(productions_values)
+            productions = self.env['mrp.production']
+            for company_id, productions_values in productions_values_by_company.items():
+                # create the MOs as SUPERUSER
+                new_productions = self.env['mrp.production'].with_user(SUPERUSER_ID).sudo().with_company(
+                    company_id).create(productions_values)
+                new_productions.action_confirm()
+                productions |= new_productions
+            self._post_production_origin_messages(productions)
             return True
 
         # Normal flow - intercept and create consolidated MO
@@ -170,3 +153,25 @@ class StockRule(models.Model):
             }
 
         return True
+
+    @api.model
+    def _post_production_origin_messages(self, productions):
+        """Log the origin of the new manufacturing orders, one batch of messages
+        per message type instead of one message_post per production"""
+        manual_bodies = {}
+        origin_bodies = {}
+        for production in productions:
+            origin_production = production.move_dest_ids and production.move_dest_ids[
+                0].raw_material_production_id or False
+            orderpoint = production.orderpoint_id
+            if orderpoint and orderpoint.create_uid.id == SUPERUSER_ID and orderpoint.trigger == 'manual':
+                manual_bodies[production.id] = _('This production order has been created from Replenishment Report.')
+            elif orderpoint or origin_production:
+                origin_bodies[production.id] = self.env['ir.qweb']._render(
+                    'mail.message_origin_link',
+                    {'self': production, 'origin': orderpoint or origin_production},
+                    minimal_qcontext=True)
+        if manual_bodies:
+            productions.browse(list(manual_bodies))._message_log_batch(manual_bodies, message_type='comment')
+        if origin_bodies:
+            productions.browse(list(origin_bodies))._message_log_batch(origin_bodies)
@@ -0,0 +1,69 @@
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestMrpProductionConsolidated(TransactionCase):
+    """Test cases for the creation of MOs from consolidated MOs"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env.company
+        cls.warehouse = cls.env['stock.warehouse'].search([('company_id', '=', cls.company.id)], limit=1)
+        cls.component = cls.env['product.product'].create({
+            'name': 'Consolidated Test Component',
+            'type': 'consu',
+            'is_storable': True,
+        })
+        cls.products = cls.env['product.product'].create([{
+            'name': 'Consolidated Test Product %s' % index,
+            'type': 'consu',
+            'is_storable': True,
+        } for index in range(2)])
+        cls.boms = cls.env['mrp.bom'].create([{
+            'product_tmpl_id': product.product_tmpl_id.id,
+            'product_qty': 1,
+            'bom_line_ids': [(0, 0, {'product_id': cls.component.id, 'product_qty': 2})],
+        } for product in cls.products])
+        cls.manual_orderpoint, cls.auto_orderpoint = cls.env['stock.warehouse.orderpoint'].create([{
+            'product_id': product.id,
+            'warehouse_id': cls.warehouse.id,
+            'location_id': cls.warehouse.lot_stock_id.id,
+            'trigger': trigger,
+        } for product, trigger in zip(cls.products, ('manual', 'auto'))])
+        cls.consolidations = cls.env['mrp.production.consolidated'].create([{
+            'name': 'Consolidated MO %s' % product.name,
+            'state': 'confirmed',
+            'component_line_ids': [(0, 0, {
+                'product_id': product.id,
+                'component_product_id': cls.component.id,
+                'product_qty': 3,
+                'component_qty': 6,
+                'bom_id': bom.id,
+                'orderpoint_id': orderpoint.id,
+                'picking_type_id': cls.warehouse.manu_type_id.id,
+                'location_src_id': cls.warehouse.lot_stock_id.id,
+                'location_dest_id': cls.warehouse.lot_stock_id.id,
+                'date_planned_start': fields.Datetime.now(),
+                'product_uom_id': product.uom_id.id,
+            })],
+        } for product, bom, orderpoint in zip(
+            cls.products, cls.boms, cls.manual_orderpoint | cls.auto_orderpoint)])
+
+    def test_01_action_done_creates_confirmed_mos(self):
+        """Test the MOs of several consolidated MOs are created, confirmed and noted"""
+        self.consolidations.action_done()
+        self.assertEqual(set(self.consolidations.mapped('state')), {'done'})
+        productions = self.env['mrp.production'].search([('product_id', 'in', self.products.ids)])
+        self.assertEqual(productions.product_id, self.products)
+        self.assertEqual(set(productions.mapped('state')), {'confirmed'})
+        self.assertEqual(productions.mapped('product_qty'), [3, 3])
+        self.assertEqual(productions.bom_id, self.boms)
+        self.assertEqual(productions.move_raw_ids.product_id, self.component)
+        manual_production = productions.filtered(lambda p: p.orderpoint_id == self.manual_orderpoint)
+        auto_production = productions.filtered(lambda p: p.orderpoint_id == self.auto_orderpoint)
+        self.assertTrue(manual_production.message_ids.filtered(
+            lambda m: m.message_type == 'comment' and 'Replenishment Report' in m.body))
+        self.assertTrue(auto_production.message_ids.filtered(
+            lambda m: self.auto_orderpoint.display_name in m.body))
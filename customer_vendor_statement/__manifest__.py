@@ -17,6 +17,7 @@
     ],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/statement.xml',
         'wizard/customer_vendor_statement_wizard.xml',
     ],
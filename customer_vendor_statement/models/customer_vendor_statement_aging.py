@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
+
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+AGING_ACCOUNT_TYPES = ['asset_receivable', 'liability_payable']
+
+
+class CustomerVendorStatementAging(models.Model):
+    """Open amounts per partner, currency and account type split into aging
+    buckets as of a date, built by a cron. Each row also records the number,
+    the last write date and the residual of the open lines of its partner,
+    the snapshot of a partner whose open lines changed since is stale and is
+    ignored until the cron refreshes it."""
+
+    _name = 'customer.vendor.statement.aging'
+    _description = 'Customer Vendor Statement Aging Snapshot'
+    _log_access = False
+
+    partner_id = fields.Many2one('res.partner', required=True, ondelete='cascade')
+    company_id = fields.Many2one('res.company', required=True, ondelete='cascade')
+    currency_id = fields.Many2one('res.currency', required=True)
+    account_type = fields.Selection(
+        [
+            ('asset_receivable', 'Receivable'),
+            ('liability_payable', 'Payable'),
+        ],
+        required=True
+    )
+    date = fields.Date(required=True)
+    current = fields.Monetary()
+    b_1_30 = fields.Monetary(string='1-30 Days Due')
+    b_30_60 = fields.Monetary(string='30-60 Days Due')
+    b_60_90 = fields.Monetary(string='60-90 Days Due')
+    b_90_120 = fields.Monetary(string='90-120 Days Due')
+    b_over_120 = fields.Monetary(string='+120 Days Due')
+    balance = fields.Monetary(string='Balance Due')
+    open_line_count = fields.Integer()
+    open_write_date = fields.Datetime()
+    open_residual = fields.Float()
+
+    _company_date_partner_idx = models.Index('(company_id, date, partner_id)')
+
+    @api.model
+    def _has_snapshot(self, company_id, date):
+        self.env.cr.execute("""
+            SELECT 1 FROM customer_vendor_statement_aging
+            WHERE company_id = %s AND date = %s LIMIT 1
+        """, (company_id, date))
+        return bool(self.env.cr.rowcount)
+
+    @api.model
+    def _refresh(self, company, date, partner_ids=None):
+        """Rebuild the snapshot of ``company`` as of ``date`` for the given
+        partners, or for every partner with open items when omitted."""
+        cr = self.env.cr
+        self.env.flush_all()
+        if partner_ids is None:
+            cr.execute("""
+                SELECT DISTINCT l.partner_id
+                FROM account_move_line l
+                JOIN account_account acc ON (acc.id = l.account_id)
+                WHERE l.company_id = %s AND l.partner_id IS NOT NULL
+                    AND NOT l.reconciled
+                    AND acc.account_type = ANY(%s)
+            """, (company.id, AGING_ACCOUNT_TYPES))
+            partner_ids = [row[0] for row in cr.fetchall()]
+            cr.execute("""
+                DELETE FROM customer_vendor_statement_aging
+                WHERE company_id = %s AND date = %s
+            """, (company.id, date))
+        else:
+            cr.execute("""
+                DELETE FROM customer_vendor_statement_aging
+                WHERE company_id = %s AND date = %s AND partner_id = ANY(%s)
+            """, (company.id, date, list(partner_ids)))
+        if not partner_ids:
+            return
+        statement = self.env['report.customer_vendor_statement.statement']
+        params = statement._get_statement_params(
+            company.id, partner_ids, date, date, AGING_ACCOUNT_TYPES,
+            show_buckets=True, today=date)
+        params['open_items_only'] = True
+        cr.execute("""
+            INSERT INTO customer_vendor_statement_aging (
+                partner_id, company_id, currency_id, account_type, date,
+                current, b_1_30, b_30_60, b_60_90, b_90_120, b_over_120,
+                balance, open_line_count, open_write_date, open_residual)
+            WITH statement_lines AS MATERIALIZED (%s),
+            open_items AS (%s),
+            open_lines AS (%s)
+            SELECT oi.partner_id, %%(company_id)s, oi.currency_id,
+                oi.account_type, %%(date_end)s, %s,
+                ol.line_count, ol.write_date, ol.residual
+            FROM open_items oi
+            JOIN open_lines ol ON (ol.partner_id = oi.partner_id)
+            GROUP BY oi.partner_id, oi.currency_id, oi.account_type,
+                ol.line_count, ol.write_date, ol.residual
+        """ % (statement._statement_lines_sql(),
+               statement._statement_open_items_sql(),
+               self._open_lines_sql(),
+               statement._statement_aging_columns_sql()), params)
+        self.invalidate_model()
+
+    @api.model
+    def _open_lines_sql(self):
+        """Number, last write date and residual of the open lines of each
+        partner. Recomputed fields, such as ``amount_residual`` or the
+        ``date`` related to the move, also update the write date of the
+        lines."""
+        return """
+            SELECT l.partner_id, count(*) AS line_count,
+                max(l.write_date) AS write_date,
+                sum(l.amount_residual) AS residual
+            FROM account_move_line l
+            JOIN account_account acc ON (acc.id = l.account_id)
+            WHERE l.company_id = %(company_id)s AND l.partner_id IS NOT NULL
+                AND (%(partner_ids)s IS NULL
+                     OR l.partner_id = ANY(%(partner_ids)s))
+                AND acc.account_type = ANY(%(account_types)s)
+                AND NOT l.reconciled
+            GROUP BY l.partner_id
+        """
+
+    @api.model
+    def _get_stale_partner_ids(self, company_id, date, partner_ids=None):
+        """Partners, among ``partner_ids`` or all of them, whose open lines
+        changed since their snapshot was built."""
+        self.env.flush_all()
+        self.env.cr.execute("""
+            WITH open_lines AS (%s),
+            snapshot AS (
+                SELECT DISTINCT partner_id, open_line_count, open_write_date,
+                    open_residual
+                FROM customer_vendor_statement_aging
+                WHERE company_id = %%(company_id)s AND date = %%(date)s
+                    AND (%%(partner_ids)s IS NULL
+                         OR partner_id = ANY(%%(partner_ids)s))
+            )
+            SELECT COALESCE(o.partner_id, s.partner_id)
+            FROM open_lines o
+            FULL JOIN snapshot s ON (s.partner_id = o.partner_id)
+            WHERE o.line_count IS DISTINCT FROM s.open_line_count
+                OR o.write_date IS DISTINCT FROM s.open_write_date
+                OR o.residual IS DISTINCT FROM s.open_residual
+        """ % self._open_lines_sql(), {
+            'company_id': company_id,
+            'date': date,
+            'partner_ids': None if partner_ids is None else list(partner_ids),
+            'account_types': AGING_ACCOUNT_TYPES,
+        })
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _get_snapshot_dates(self):
+        """Current date in the timezone of every internal user, the dates
+        for which statements can be printed with today's aging."""
+        users = self.env['res.users'].search([('share', '=', False)])
+        now = fields.Datetime.now()
+        return {
+            fields.Date.context_today(self.with_context(tz=tz or 'UTC'), now)
+            for tz in set(users.mapped('tz'))
+        }
+
+    @api.model
+    def _cron_refresh_snapshot(self):
+        """Build the snapshot of every company for the current dates, or
+        refresh its stale partners when it exists, and drop older ones."""
+        dates = sorted(self._get_snapshot_dates())
+        self.env.cr.execute("""
+            DELETE FROM customer_vendor_statement_aging WHERE date != ALL(%s)
+        """, (dates,))
+        for company in self.env['res.company'].search([]):
+            for date in dates:
+                if not self._has_snapshot(company.id, date):
+                    self._refresh(company, date)
+                    _logger.info(
+                        'Statement aging snapshot of %s rebuilt for %s',
+                        date, company.name)
+                    continue
+                partner_ids = self._get_stale_partner_ids(company.id, date)
+                if partner_ids:
+                    self._refresh(company, date, partner_ids)
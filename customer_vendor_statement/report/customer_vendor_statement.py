@@ -14,12 +14,55 @@ class CustomerVendorStatement(models.AbstractModel):
     _name = 'report.customer_vendor_statement.statement'
     _description = 'Customer Vendor Statement Report'
 
+    _STATEMENT_ROW_FIELDS = {
+        'balance': ('currency_id', 'balance'),
+        'line': ('move_id', 'date', 'date_maturity', 'name', 'ref', 'debit',
+                 'credit', 'amount', 'currency_id'),
+        'bucket': ('currency_id', 'current', 'b_1_30', 'b_30_60', 'b_60_90',
+                   'b_90_120', 'b_over_120', 'balance'),
+    }
+    _STATEMENT_FLOAT_FIELDS = (
+        'balance', 'debit', 'credit', 'amount', 'current', 'b_1_30',
+        'b_30_60', 'b_60_90', 'b_90_120', 'b_over_120',
+    )
+
     def _format_date_to_partner_lang(self, str_date, partner_id):
         lang_code = self.env['res.partner'].browse(partner_id).lang
-        lang_id = self.env['res.lang']._lang_get(lang_code)
-        lang = self.env['res.lang'].browse(lang_id)
+        return self._format_date_to_lang(str_date, lang_code)
+
+    def _format_date_to_lang(self, str_date, lang_code):
         return str_date
 
+    def _get_partner_date_formatter(self, partner_ids):
+        """Return ``format_date(value, partner_id)``. Partner languages are
+        read once and each (date, language) pair is formatted once."""
+        lang_by_partner = {
+            partner.id: partner.lang
+            for partner in self.env['res.partner'].browse(partner_ids)
+        }
+        formatted = {}
+
+        def format_date(value, partner_id):
+            key = (value, lang_by_partner.get(partner_id))
+            if key not in formatted:
+                formatted[key] = self._format_date_to_lang(*key)
+            return formatted[key]
+        return format_date
+
+    def _get_statement_currencies(self, statement):
+        """Map every currency id found in ``statement`` to its record,
+        browsed together so they share one prefetch."""
+        currency_ids = {
+            line['currency_id']
+            for rows in statement.values()
+            for partner_rows in rows.values()
+            for line in partner_rows
+        }
+        return {
+            currency.id: currency
+            for currency in self.env['res.currency'].browse(list(currency_ids))
+        }
+
     def _to_date(self, date_value):
         """Convert date value to date object (handles both string and date)"""
         if isinstance(date_value, str):
@@ -30,938 +73,270 @@ class CustomerVendorStatement(models.AbstractModel):
             return date_value
         return date_value
 
-    def _initial_balance_sql_q1(self, partners, date_start):
-        return """
-            SELECT l.partner_id, l.currency_id, l.company_id,
-            CASE WHEN l.currency_id is not null AND l.amount_currency > 0.000
-                THEN sum(l.amount_currency)
-                ELSE sum(l.debit)
-            END as debit,
-            CASE WHEN l.currency_id is not null AND l.amount_currency < 0.000
-                THEN sum(l.amount_currency * (-1))
-                ELSE sum(l.credit)
-            END as credit
-            FROM account_move_line l
-            JOIN account_account acc ON (acc.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            WHERE l.partner_id IN (%s) AND acc.account_type = 'asset_receivable'
-                                AND l.date <= '%s' 
-            GROUP BY l.partner_id, l.currency_id, l.amount_currency,
-                                l.company_id
-        """ % (partners, date_start)
-
-    def _initial_balance_sql_q1_payable(self, partners, date_start):
-        return """
-            SELECT l.partner_id, l.currency_id, l.company_id,
-            CASE WHEN l.currency_id is not null AND l.amount_currency > 0.000
-                THEN sum(l.amount_currency)
-                ELSE sum(l.debit)
-            END as debit,
-            CASE WHEN l.currency_id is not null AND l.amount_currency < 0.000
-                THEN sum(l.amount_currency * (-1))
-                ELSE sum(l.credit)
-            END as credit
-            FROM account_move_line l
-            JOIN account_account acc ON (acc.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            WHERE l.partner_id IN (%s) AND acc.account_type = 'liability_payable'
-                                AND l.date <= '%s' 
-            GROUP BY l.partner_id, l.currency_id, l.amount_currency,
-                                l.company_id
-        """ % (partners, date_start)
-
-    def _initial_balance_sql_q1_receivable_and_payable(self, partners, date_start):
-        return """
-            SELECT l.partner_id, l.currency_id, l.company_id,
-            CASE WHEN l.currency_id is not null AND l.amount_currency > 0.000
-                THEN sum(l.amount_currency)
-                ELSE sum(l.debit)
-            END as debit,
-            CASE WHEN l.currency_id is not null AND l.amount_currency < 0.000
-                THEN sum(l.amount_currency * (-1))
-                ELSE sum(l.credit)
-            END as credit
-            FROM account_move_line l
-            JOIN account_account acc ON (acc.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            WHERE l.partner_id IN (%s) AND (acc.account_type = 'liability_payable' OR acc.account_type = 'asset_receivable')
-                                AND l.date <= '%s' 
-            GROUP BY l.partner_id, l.currency_id, l.amount_currency,
-                                l.company_id
-        """ % (partners, date_start)
-
-    def _initial_balance_sql_q2(self, company_id):
-        return """
-            SELECT Q1.partner_id, debit-credit AS balance,
-            COALESCE(Q1.currency_id, c.currency_id) AS currency_id
-            FROM Q1
-            JOIN res_company c ON (c.id = Q1.company_id)
-            WHERE c.id = %s
-        """ % company_id
-
-    def _initial_balance_sql_q2_payable(self, company_id):
-        return """
-            SELECT Q1.partner_id, debit-credit AS balance,
-            COALESCE(Q1.currency_id, c.currency_id) AS currency_id
-            FROM Q1
-            JOIN res_company c ON (c.id = Q1.company_id)
-            WHERE c.id = %s
-        """ % company_id
-
-    def _initial_balance_sql_q2_receivable_and_payable(self, company_id):
-        return """
-            SELECT Q1.partner_id, debit-credit AS balance,
-            COALESCE(Q1.currency_id, c.currency_id) AS currency_id
-            FROM Q1
-            JOIN res_company c ON (c.id = Q1.company_id)
-            WHERE c.id = %s
-        """ % company_id
-
-    def _get_account_initial_balance(self, company_id, partner_ids, date_start):
-        res = dict(map(lambda x: (x, []), partner_ids))
-        partners = ', '.join([str(i) for i in partner_ids])
-        date_start = self._to_date(date_start)
-        self.env.cr.execute("""WITH Q1 AS (%s), Q2 AS (%s)
-        SELECT partner_id, currency_id, balance
-        FROM Q2""" % (self._initial_balance_sql_q1(partners, date_start),
-                      self._initial_balance_sql_q2(company_id)))
-        for row in self.env.cr.dictfetchall():
-            row['balance'] = float(row['balance'])
-            res[row.pop('partner_id')].append(row)
-        return res
-
-    def _get_account_initial_balance_payable(self, company_id, partner_ids, date_start):
-        res = dict(map(lambda x: (x, []), partner_ids))
-        partners = ', '.join([str(i) for i in partner_ids])
-        date_start = self._to_date(date_start)
-        self.env.cr.execute("""WITH Q1 AS (%s), Q2 AS (%s)
-        SELECT partner_id, currency_id, balance
-        FROM Q2""" % (self._initial_balance_sql_q1_payable(partners, date_start),
-                      self._initial_balance_sql_q2_payable(company_id)))
-        for row in self.env.cr.dictfetchall():
-            row['balance'] = float(row['balance'])
-            res[row.pop('partner_id')].append(row)
-        return res
-
-    def _get_account_initial_balance_receivable_and_payable(self, company_id, partner_ids, date_start):
-        res = dict(map(lambda x: (x, []), partner_ids))
-        partners = ', '.join([str(i) for i in partner_ids])
-        date_start = self._to_date(date_start)
-        self.env.cr.execute("""WITH Q1 AS (%s), Q2 AS (%s)
-        SELECT partner_id, currency_id, balance
-        FROM Q2""" % (self._initial_balance_sql_q1_receivable_and_payable(partners, date_start),
-                      self._initial_balance_sql_q2_receivable_and_payable(company_id)))
-        for row in self.env.cr.dictfetchall():
-            row['balance'] = float(row['balance'])
-            res[row.pop('partner_id')].append(row)
-        return res
-
-    def _display_lines_sql_q1(self, partners, date_start, date_end):
-        return """
-            SELECT m.name AS move_id, l.partner_id, l.date, l.name,
-                                l.ref, l.currency_id, l.company_id,
-            CASE WHEN (l.currency_id is not null AND l.amount_currency > 0.000)
-                THEN sum(l.amount_currency)
-                ELSE sum(l.debit)
-            END as debit,
-            CASE WHEN (l.currency_id is not null AND l.amount_currency < 0.000)
-                THEN sum(l.amount_currency * (-1))
-                ELSE sum(l.credit)
-            END as credit,
-            CASE WHEN l.date_maturity is null
-                THEN l.date
-                ELSE l.date_maturity
-            END as date_maturity
-            FROM account_move_line l
-            JOIN account_account acc ON (acc.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            WHERE l.partner_id IN (%s) AND acc.account_type = 'asset_receivable'
-                                AND '%s' < l.date AND l.date <= '%s'
-            GROUP BY l.partner_id, m.name, l.date, l.date_maturity, l.name,
-                                l.ref, l.currency_id,
-                                l.amount_currency, l.company_id
-        """ % (partners, date_start, date_end)
-
-    def _display_lines_sql_q1_payable(self, partners, date_start, date_end):
-        return """
-            SELECT m.name AS move_id, l.partner_id, l.date, l.name,
-                                l.ref, l.currency_id, l.company_id,
-            CASE WHEN (l.currency_id is not null AND l.amount_currency > 0.000)
-                THEN sum(l.amount_currency)
-                ELSE sum(l.debit)
-            END as debit,
-            CASE WHEN (l.currency_id is not null AND l.amount_currency < 0.000)
-                THEN sum(l.amount_currency * (-1))
-                ELSE sum(l.credit)
-            END as credit,
-            CASE WHEN l.date_maturity is null
-                THEN l.date
-                ELSE l.date_maturity
-            END as date_maturity
-            FROM account_move_line l
-            JOIN account_account acc ON (acc.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            WHERE l.partner_id IN (%s) AND acc.account_type = 'liability_payable'
-                                AND '%s' < l.date AND l.date <= '%s'
-            GROUP BY l.partner_id, m.name, l.date, l.date_maturity, l.name,
-                                l.ref, l.currency_id,
-                                l.amount_currency, l.company_id
-        """ % (partners, date_start, date_end)
-
-    def _display_lines_sql_q1_receivable_and_payable(self, partners, date_start, date_end):
-        return """
-            SELECT m.name AS move_id, l.partner_id, l.date, l.name,
-                                l.ref, l.currency_id, l.company_id,
-            CASE WHEN (l.currency_id is not null AND l.amount_currency > 0.000)
-                THEN sum(l.amount_currency)
-                ELSE sum(l.debit)
-            END as debit,
-            CASE WHEN (l.currency_id is not null AND l.amount_currency < 0.000)
-                THEN sum(l.amount_currency * (-1))
-                ELSE sum(l.credit)
-            END as credit,
-            CASE WHEN l.date_maturity is null
-                THEN l.date
-                ELSE l.date_maturity
-            END as date_maturity
-            FROM account_move_line l
-            JOIN account_account acc ON (acc.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            WHERE l.partner_id IN (%s) AND (acc.account_type = 'liability_payable' OR acc.account_type = 'asset_receivable')
-                                AND '%s' < l.date AND l.date <= '%s'
-            GROUP BY l.partner_id, m.name, l.date, l.date_maturity, l.name,
-                                l.ref, l.currency_id,
-                                l.amount_currency, l.company_id
-        """ % (partners, date_start, date_end)
-
-    def _display_lines_sql_q2(self, company_id):
-        return """
-            SELECT Q1.partner_id, move_id, date, date_maturity, Q1.name, ref,
-                            debit, credit, debit-credit as amount,
-            COALESCE(Q1.currency_id, c.currency_id) AS currency_id
-            FROM Q1
-            JOIN res_company c ON (c.id = Q1.company_id)
-            WHERE c.id = %s
-        """ % company_id
-
-    def _display_lines_sql_q2_payable(self, company_id):
-        return """
-            SELECT Q1.partner_id, move_id, date, date_maturity, Q1.name, ref,
-                            debit, credit, debit-credit as amount,
-            COALESCE(Q1.currency_id, c.currency_id) AS currency_id
-            FROM Q1
-            JOIN res_company c ON (c.id = Q1.company_id)
-            WHERE c.id = %s
-        """ % company_id
-
-    def _display_lines_sql_q2_receivable_and_payable(self, company_id):
-        return """
-            SELECT Q1.partner_id, move_id, date, date_maturity, Q1.name, ref,
-                            debit, credit, debit-credit as amount,
-            COALESCE(Q1.currency_id, c.currency_id) AS currency_id
-            FROM Q1
-            JOIN res_company c ON (c.id = Q1.company_id)
-            WHERE c.id = %s
-        """ % company_id
-
-    def _get_account_display_lines(self, company_id, partner_ids, date_start, date_end):
-        res = dict(map(lambda x: (x, []), partner_ids))
-        partners = ', '.join([str(i) for i in partner_ids])
-        date_start = self._to_date(date_start)
-        date_end = self._to_date(date_end)
-        self.env.cr.execute("""WITH Q1 AS (%s), Q2 AS (%s)
-        SELECT partner_id, move_id, date, date_maturity, name, ref, debit,
-                            credit, amount, currency_id
-        FROM Q2
-        ORDER BY date, date_maturity, move_id""" % (
-            self._display_lines_sql_q1(partners, date_start, date_end),
-            self._display_lines_sql_q2(company_id)))
-        for row in self.env.cr.dictfetchall():
-            row['debit'] = float(row['debit'])
-            row['credit'] = float(row['credit'])
-            row['amount'] = float(row['amount'])
-            res[row.pop('partner_id')].append(row)
-        return res
-
-    def _get_account_display_lines_payable(self, company_id, partner_ids, date_start, date_end):
-        res = dict(map(lambda x: (x, []), partner_ids))
-        partners = ', '.join([str(i) for i in partner_ids])
-        date_start = self._to_date(date_start)
-        date_end = self._to_date(date_end)
-        self.env.cr.execute("""WITH Q1 AS (%s), Q2 AS (%s)
-        SELECT partner_id, move_id, date, date_maturity, name, ref, debit,
-                            credit, amount, currency_id
-        FROM Q2
-        ORDER BY date, date_maturity, move_id""" % (
-            self._display_lines_sql_q1_payable(partners, date_start, date_end),
-            self._display_lines_sql_q2_payable(company_id)))
-        for row in self.env.cr.dictfetchall():
-            row['debit'] = float(row['debit'])
-            row['credit'] = float(row['credit'])
-            row['amount'] = float(row['amount'])
-            res[row.pop('partner_id')].append(row)
-        return res
-
-    def _get_account_display_lines_receivable_and_payable(self, company_id, partner_ids, date_start, date_end):
-        res = dict(map(lambda x: (x, []), partner_ids))
-        partners = ', '.join([str(i) for i in partner_ids])
-        date_start = self._to_date(date_start)
-        date_end = self._to_date(date_end)
-        self.env.cr.execute("""WITH Q1 AS (%s), Q2 AS (%s)
-        SELECT partner_id, move_id, date, date_maturity, name, ref, debit,
-                            credit, amount, currency_id
-        FROM Q2
-        ORDER BY date, date_maturity, move_id""" % (
-            self._display_lines_sql_q1_receivable_and_payable(partners, date_start, date_end),
-            self._display_lines_sql_q2_receivable_and_payable(company_id)))
-        for row in self.env.cr.dictfetchall():
-            row['debit'] = float(row['debit'])
-            row['credit'] = float(row['credit'])
-            row['amount'] = float(row['amount'])
-            res[row.pop('partner_id')].append(row)
-        return res
+    def _get_statement_account_types(self, report_type):
+        """Account types covered by the given report type"""
+        return {
+            'receivable': ['asset_receivable'],
+            'payable': ['liability_payable'],
+            'receivable_and_payable': ['asset_receivable', 'liability_payable'],
+        }[report_type]
 
-    def _show_buckets_sql_q1(self, partners, date_end):
-        return """
-            SELECT l.partner_id, l.currency_id, l.company_id, l.move_id,
-            CASE WHEN l.balance > 0.000
-                THEN l.balance - sum(coalesce(pd.amount, 0.000))
-                ELSE l.balance + sum(coalesce(pc.amount, 0.000))
-            END AS open_due,
-            CASE WHEN l.balance > 0.000
-                THEN l.amount_currency - sum(coalesce(pd.amount_currency, 0.000))
-                ELSE l.amount_currency + sum(coalesce(pc.amount_currency, 0.000))
-            END AS open_due_currency,
-            CASE WHEN l.date_maturity is null
-                THEN l.date
-                ELSE l.date_maturity
-            END as date_maturity
-            FROM account_move_line l
-            JOIN account_account acc ON (acc.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            LEFT JOIN (SELECT pr.*
-                FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.credit_move_id = l2.id
-                WHERE l2.date <= '%s'
-            ) as pd ON pd.debit_move_id = l.id
-            LEFT JOIN (SELECT pr.*
-                FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.debit_move_id = l2.id
-                WHERE l2.date <= '%s'
-            ) as pc ON pc.credit_move_id = l.id
-            WHERE l.partner_id IN (%s) AND acc.account_type = 'asset_receivable'
-                                AND not l.reconciled 
-            GROUP BY l.partner_id, l.currency_id, l.date, l.date_maturity,
-                                l.amount_currency, l.balance, l.move_id,
-                                l.company_id
-        """ % (date_end, date_end, partners)
+    def _get_bucket_dates(self, today=None):
+        """Get bucket dates dynamically"""
+        today = today or fields.Date.context_today(self)
+        return {
+            'today': today,
+            'minus_30': today - timedelta(days=30),
+            'minus_60': today - timedelta(days=60),
+            'minus_90': today - timedelta(days=90),
+            'minus_120': today - timedelta(days=120),
+        }
 
-    def _show_buckets_sql_q1_payable(self, partners, date_end):
+    def _statement_lines_sql(self):
+        """Partner move lines on the requested account types. With
+        ``open_items_only`` only the unreconciled ones are kept."""
         return """
-            SELECT l.partner_id, l.currency_id, l.company_id, l.move_id,
-            CASE WHEN l.balance > 0.000
-                THEN l.balance - sum(coalesce(pd.amount, 0.000))
-                ELSE l.balance + sum(coalesce(pc.amount, 0.000))
-            END AS open_due,
-            CASE WHEN l.balance > 0.000
-                THEN l.amount_currency - sum(coalesce(pd.amount_currency, 0.000))
-                ELSE l.amount_currency + sum(coalesce(pc.amount_currency, 0.000))
-            END AS open_due_currency,
-            CASE WHEN l.date_maturity is null
-                THEN l.date
-                ELSE l.date_maturity
-            END as date_maturity
+            SELECT l.id, l.partner_id, l.date, l.name, l.ref,
+                l.balance, l.amount_currency, l.reconciled,
+                acc.account_type,
+                l.currency_id AS line_currency_id,
+                COALESCE(l.currency_id, %(company_currency_id)s) AS currency_id,
+                m.name AS move_name,
+                COALESCE(l.date_maturity, l.date) AS date_maturity,
+                CASE WHEN l.currency_id IS NOT NULL AND l.amount_currency > 0.000
+                    THEN l.amount_currency
+                    ELSE l.debit
+                END AS debit,
+                CASE WHEN l.currency_id IS NOT NULL AND l.amount_currency < 0.000
+                    THEN l.amount_currency * (-1)
+                    ELSE l.credit
+                END AS credit
             FROM account_move_line l
             JOIN account_account acc ON (acc.id = l.account_id)
             JOIN account_move m ON (l.move_id = m.id)
-            LEFT JOIN (SELECT pr.*
-                FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.credit_move_id = l2.id
-                WHERE l2.date <= '%s'
-            ) as pd ON pd.debit_move_id = l.id
-            LEFT JOIN (SELECT pr.*
-                FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.debit_move_id = l2.id
-                WHERE l2.date <= '%s'
-            ) as pc ON pc.credit_move_id = l.id
-            WHERE l.partner_id IN (%s) AND acc.account_type = 'liability_payable'
-                                AND not l.reconciled 
-            GROUP BY l.partner_id, l.currency_id, l.date, l.date_maturity,
-                                l.amount_currency, l.balance, l.move_id,
-                                l.company_id
-        """ % (date_end, date_end, partners)
+            WHERE l.partner_id = ANY(%(partner_ids)s)
+                AND l.company_id = %(company_id)s
+                AND acc.account_type = ANY(%(account_types)s)
+                AND (NOT %(open_items_only)s OR NOT l.reconciled)
+                AND (l.date <= %(date_end)s
+                     OR (%(show_buckets)s AND NOT l.reconciled))
+        """
 
-    def _show_buckets_sql_q1_receivable_and_payable(self, partners, date_end):
+    def _statement_open_items_sql(self):
+        """Amount still open at ``date_end`` for each unreconciled line of
+        ``statement_lines``."""
         return """
-            SELECT l.partner_id, l.currency_id, l.company_id, l.move_id,
-            CASE WHEN l.balance > 0.000
-                THEN l.balance - sum(coalesce(pd.amount, 0.000))
-                ELSE l.balance + sum(coalesce(pc.amount, 0.000))
-            END AS open_due,
-            CASE WHEN l.balance > 0.000
-                THEN l.amount_currency - sum(coalesce(pd.amount_currency, 0.000))
-                ELSE l.amount_currency + sum(coalesce(pc.amount_currency, 0.000))
-            END AS open_due_currency,
-            CASE WHEN l.date_maturity is null
-                THEN l.date
-                ELSE l.date_maturity
-            END as date_maturity
-            FROM account_move_line l
-            JOIN account_account acc ON (acc.id = l.account_id)
-            JOIN account_move m ON (l.move_id = m.id)
-            LEFT JOIN (SELECT pr.*
+            SELECT sl.partner_id, sl.currency_id, sl.account_type,
+            sl.date_maturity,
+            CASE
+                WHEN sl.line_currency_id IS NULL AND sl.balance > 0.000
+                    THEN sl.balance - COALESCE(pd.amount, 0.000)
+                WHEN sl.line_currency_id IS NULL
+                    THEN sl.balance + COALESCE(pc.amount, 0.000)
+                WHEN sl.balance > 0.000
+                    THEN sl.amount_currency - COALESCE(pd.amount_currency, 0.000)
+                ELSE sl.amount_currency + COALESCE(pc.amount_currency, 0.000)
+            END AS open_due
+            FROM statement_lines sl
+            LEFT JOIN LATERAL (
+                SELECT sum(pr.amount) AS amount,
+                    sum(pr.debit_amount_currency) AS amount_currency
                 FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.credit_move_id = l2.id
-                WHERE l2.date <= '%s'
-            ) as pd ON pd.debit_move_id = l.id
-            LEFT JOIN (SELECT pr.*
+                JOIN account_move_line l2 ON (pr.credit_move_id = l2.id)
+                WHERE pr.debit_move_id = sl.id AND l2.date <= %(date_end)s
+            ) pd ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT sum(pr.amount) AS amount,
+                    sum(pr.credit_amount_currency) AS amount_currency
                 FROM account_partial_reconcile pr
-                INNER JOIN account_move_line l2
-                ON pr.debit_move_id = l2.id
-                WHERE l2.date <= '%s'
-            ) as pc ON pc.credit_move_id = l.id
-            WHERE l.partner_id IN (%s) AND (acc.account_type = 'liability_payable' OR acc.account_type = 'asset_receivable')
-                                AND not l.reconciled 
-            GROUP BY l.partner_id, l.currency_id, l.date, l.date_maturity,
-                                l.amount_currency, l.balance, l.move_id,
-                                l.company_id
-        """ % (date_end, date_end, partners)
-
-    def _show_buckets_sql_q2(self, today, minus_30, minus_60, minus_90, minus_120):
-        return """
-            SELECT partner_id, currency_id, date_maturity, open_due,
-                            open_due_currency, move_id, company_id,
-            CASE
-                WHEN '%s' <= date_maturity AND currency_id is null
-                                THEN open_due
-                WHEN '%s' <= date_maturity AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as current,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity < '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity < '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_1_30,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_30_60,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_60_90,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_90_120,
-            CASE
-                WHEN date_maturity <= '%s' AND currency_id is null
-                                THEN open_due
-                WHEN date_maturity <= '%s' AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_over_120
-            FROM Q1
-            GROUP BY partner_id, currency_id, date_maturity, open_due,
-                                open_due_currency, move_id, company_id
-        """ % (today, today, minus_30, today, minus_30, today, minus_60,
-               minus_30, minus_60, minus_30, minus_90, minus_60, minus_90,
-               minus_60, minus_120, minus_90, minus_120, minus_90, minus_120,
-               minus_120)
-
-    def _show_buckets_sql_q2_payable(self, today, minus_30, minus_60, minus_90, minus_120):
-        return """
-            SELECT partner_id, currency_id, date_maturity, open_due,
-                            open_due_currency, move_id, company_id,
-            CASE
-                WHEN '%s' <= date_maturity AND currency_id is null
-                                THEN open_due
-                WHEN '%s' <= date_maturity AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as current,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity < '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity < '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_1_30,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_30_60,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_60_90,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_90_120,
-            CASE
-                WHEN date_maturity <= '%s' AND currency_id is null
-                                THEN open_due
-                WHEN date_maturity <= '%s' AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_over_120
-            FROM Q1
-            GROUP BY partner_id, currency_id, date_maturity, open_due,
-                                open_due_currency, move_id, company_id
-        """ % (today, today, minus_30, today, minus_30, today, minus_60,
-               minus_30, minus_60, minus_30, minus_90, minus_60, minus_90,
-               minus_60, minus_120, minus_90, minus_120, minus_90, minus_120,
-               minus_120)
-
-    def _show_buckets_sql_q2_receivable_and_payable(self, today, minus_30, minus_60, minus_90, minus_120):
-        return """
-            SELECT partner_id, currency_id, date_maturity, open_due,
-                            open_due_currency, move_id, company_id,
-            CASE
-                WHEN '%s' <= date_maturity AND currency_id is null
-                                THEN open_due
-                WHEN '%s' <= date_maturity AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as current,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity < '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity < '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_1_30,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_30_60,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_60_90,
-            CASE
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is null THEN open_due
-                WHEN '%s' < date_maturity AND date_maturity <= '%s'
-                                AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_90_120,
-            CASE
-                WHEN date_maturity <= '%s' AND currency_id is null
-                                THEN open_due
-                WHEN date_maturity <= '%s' AND currency_id is not null
-                                THEN open_due_currency
-                ELSE 0.000
-            END as b_over_120
-            FROM Q1
-            GROUP BY partner_id, currency_id, date_maturity, open_due,
-                                open_due_currency, move_id, company_id
-        """ % (today, today, minus_30, today, minus_30, today, minus_60,
-               minus_30, minus_60, minus_30, minus_90, minus_60, minus_90,
-               minus_60, minus_120, minus_90, minus_120, minus_90, minus_120,
-               minus_120)
-
-    def _show_buckets_sql_q3(self, company_id):
-        return """
-            SELECT Q2.partner_id, current, b_1_30, b_30_60, b_60_90, b_90_120,
-                                b_over_120,
-            COALESCE(Q2.currency_id, c.currency_id) AS currency_id
-            FROM Q2
-            JOIN res_company c ON (c.id = Q2.company_id)
-            WHERE c.id = %s
-        """ % company_id
-
-    def _show_buckets_sql_q3_payable(self, company_id):
-        return """
-            SELECT Q2.partner_id, current, b_1_30, b_30_60, b_60_90, b_90_120,
-                                b_over_120,
-            COALESCE(Q2.currency_id, c.currency_id) AS currency_id
-            FROM Q2
-            JOIN res_company c ON (c.id = Q2.company_id)
-            WHERE c.id = %s
-        """ % company_id
-
-    def _show_buckets_sql_q3_receivable_and_payable(self, company_id):
-        return """
-            SELECT Q2.partner_id, current, b_1_30, b_30_60, b_60_90, b_90_120,
-                                b_over_120,
-            COALESCE(Q2.currency_id, c.currency_id) AS currency_id
-            FROM Q2
-            JOIN res_company c ON (c.id = Q2.company_id)
-            WHERE c.id = %s
-        """ % company_id
+                JOIN account_move_line l2 ON (pr.debit_move_id = l2.id)
+                WHERE pr.credit_move_id = sl.id AND l2.date <= %(date_end)s
+            ) pc ON TRUE
+            WHERE %(show_buckets)s AND NOT sl.reconciled
+        """
 
-    def _show_buckets_sql_q4(self):
+    def _statement_aging_columns_sql(self):
+        """Aggregates splitting ``open_due`` of ``open_items`` by maturity."""
         return """
-            SELECT partner_id, currency_id, sum(current) as current,
-                                sum(b_1_30) as b_1_30,
-                                sum(b_30_60) as b_30_60,
-                                sum(b_60_90) as b_60_90,
-                                sum(b_90_120) as b_90_120,
-                                sum(b_over_120) as b_over_120
-            FROM Q3
-            GROUP BY partner_id, currency_id
+            COALESCE(sum(open_due) FILTER (
+                WHERE %(today)s <= date_maturity), 0.000) AS current,
+            COALESCE(sum(open_due) FILTER (
+                WHERE %(minus_30)s < date_maturity
+                    AND date_maturity < %(today)s), 0.000) AS b_1_30,
+            COALESCE(sum(open_due) FILTER (
+                WHERE %(minus_60)s < date_maturity
+                    AND date_maturity <= %(minus_30)s), 0.000) AS b_30_60,
+            COALESCE(sum(open_due) FILTER (
+                WHERE %(minus_90)s < date_maturity
+                    AND date_maturity <= %(minus_60)s), 0.000) AS b_60_90,
+            COALESCE(sum(open_due) FILTER (
+                WHERE %(minus_120)s < date_maturity
+                    AND date_maturity <= %(minus_90)s), 0.000) AS b_90_120,
+            COALESCE(sum(open_due) FILTER (
+                WHERE date_maturity <= %(minus_120)s), 0.000) AS b_over_120,
+            COALESCE(sum(open_due), 0.000) AS balance
         """
 
-    def _show_buckets_sql_q4_payable(self):
+    def _statement_buckets_sql(self, use_snapshot=False):
+        if use_snapshot:
+            return """
+                SELECT partner_id, currency_id,
+                    sum(current) AS current, sum(b_1_30) AS b_1_30,
+                    sum(b_30_60) AS b_30_60, sum(b_60_90) AS b_60_90,
+                    sum(b_90_120) AS b_90_120, sum(b_over_120) AS b_over_120,
+                    sum(balance) AS balance
+                FROM customer_vendor_statement_aging
+                WHERE company_id = %(company_id)s AND date = %(date_end)s
+                    AND partner_id = ANY(%(partner_ids)s)
+                    AND account_type = ANY(%(account_types)s)
+                GROUP BY partner_id, currency_id
+            """
         return """
-            SELECT partner_id, currency_id, sum(current) as current,
-                                sum(b_1_30) as b_1_30,
-                                sum(b_30_60) as b_30_60,
-                                sum(b_60_90) as b_60_90,
-                                sum(b_90_120) as b_90_120,
-                                sum(b_over_120) as b_over_120
-            FROM Q3
+            SELECT partner_id, currency_id, %s
+            FROM open_items
             GROUP BY partner_id, currency_id
-        """
-
-    def _show_buckets_sql_q4_receivable_and_payable(self):
+        """ % self._statement_aging_columns_sql()
+
+    def _statement_sql(self, use_snapshot=False):
+        """Single statement returning, tagged by ``row_type``, the opening
+        balances, the period lines and the aging buckets of all partners.
+        The move lines are read once in ``statement_lines`` and shared by
+        the three parts. With ``use_snapshot`` the buckets are read from
+        ``customer.vendor.statement.aging`` instead."""
         return """
-            SELECT partner_id, currency_id, sum(current) as current,
-                                sum(b_1_30) as b_1_30,
-                                sum(b_30_60) as b_30_60,
-                                sum(b_60_90) as b_60_90,
-                                sum(b_90_120) as b_90_120,
-                                sum(b_over_120) as b_over_120
-            FROM Q3
+            WITH statement_lines AS MATERIALIZED (%s),
+            open_items AS (%s),
+            buckets AS (%s)
+            SELECT 'line' AS row_type, partner_id, currency_id,
+                move_name AS move_id, date, date_maturity, name, ref,
+                sum(debit) AS debit, sum(credit) AS credit,
+                sum(debit) - sum(credit) AS amount,
+                NULL::numeric AS balance,
+                NULL::numeric AS current, NULL::numeric AS b_1_30,
+                NULL::numeric AS b_30_60, NULL::numeric AS b_60_90,
+                NULL::numeric AS b_90_120, NULL::numeric AS b_over_120
+            FROM statement_lines
+            WHERE %%(date_start)s < date AND date <= %%(date_end)s
+            GROUP BY partner_id, currency_id, move_name, date, date_maturity,
+                name, ref, amount_currency
+            UNION ALL
+            SELECT 'balance', partner_id, currency_id,
+                NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+                sum(debit) - sum(credit),
+                NULL, NULL, NULL, NULL, NULL, NULL
+            FROM statement_lines
+            WHERE date <= %%(date_start)s
             GROUP BY partner_id, currency_id
-        """
-
-    def _get_bucket_dates(self):
-        """Get bucket dates dynamically"""
-        today = fields.Date.today()
-        return {
-            'today': today,
-            'minus_30': today - timedelta(days=30),
-            'minus_60': today - timedelta(days=60),
-            'minus_90': today - timedelta(days=90),
-            'minus_120': today - timedelta(days=120),
+            UNION ALL
+            SELECT 'bucket', partner_id, currency_id,
+                NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+                balance, current, b_1_30, b_30_60, b_60_90, b_90_120,
+                b_over_120
+            FROM buckets
+            ORDER BY date, date_maturity, move_id
+        """ % (self._statement_lines_sql(),
+               self._statement_open_items_sql(),
+               self._statement_buckets_sql(use_snapshot))
+
+    def _get_statement_params(self, company_id, partner_ids, date_start,
+                              date_end, account_types, show_buckets=False,
+                              today=None):
+        return dict(
+            self._get_bucket_dates(today),
+            company_id=company_id,
+            company_currency_id=self.env['res.company'].browse(
+                company_id).currency_id.id,
+            partner_ids=list(partner_ids),
+            account_types=list(account_types),
+            date_start=self._to_date(date_start),
+            date_end=self._to_date(date_end),
+            show_buckets=bool(show_buckets),
+            open_items_only=False,
+        )
+
+    def _get_statement_data(self, company_id, partner_ids, date_start,
+                            date_end, account_types, show_buckets=False):
+        """Return ``{'balance': {...}, 'line': {...}, 'bucket': {...}}``,
+        each mapping every partner id to its rows, in one round trip."""
+        res = {
+            row_type: {partner_id: [] for partner_id in partner_ids}
+            for row_type in self._STATEMENT_ROW_FIELDS
         }
-
-    def _get_account_show_buckets(self, company_id, partner_ids, date_end):
-        res = dict(map(lambda x: (x, []), partner_ids))
-        partners = ', '.join([str(i) for i in partner_ids])
-        date_end = self._to_date(date_end)
-        bucket_dates = self._get_bucket_dates()
-        self.env.cr.execute("""WITH Q1 AS (%s), Q2 AS (%s),
-        Q3 AS (%s), Q4 AS (%s)
-        SELECT partner_id, currency_id, current, b_1_30, b_30_60, b_60_90,
-                            b_90_120, b_over_120,
-                            current+b_1_30+b_30_60+b_60_90+b_90_120+b_over_120
-                            AS balance
-        FROM Q4
-        GROUP BY partner_id, currency_id, current, b_1_30, b_30_60, b_60_90,
-        b_90_120, b_over_120""" % (
-            self._show_buckets_sql_q1(partners, date_end),
-            self._show_buckets_sql_q2(
-                bucket_dates['today'],
-                bucket_dates['minus_30'],
-                bucket_dates['minus_60'],
-                bucket_dates['minus_90'],
-                bucket_dates['minus_120']),
-            self._show_buckets_sql_q3(company_id),
-            self._show_buckets_sql_q4()))
-        for row in self.env.cr.dictfetchall():
-            row['balance'] = float(row['balance'])
-            res[row.pop('partner_id')].append(row)
-        return res
-
-    def _get_account_show_buckets_payable(self, company_id, partner_ids, date_end):
-        res = dict(map(lambda x: (x, []), partner_ids))
-        partners = ', '.join([str(i) for i in partner_ids])
-        date_end = self._to_date(date_end)
-        bucket_dates = self._get_bucket_dates()
-        self.env.cr.execute("""WITH Q1 AS (%s), Q2 AS (%s),
-        Q3 AS (%s), Q4 AS (%s)
-        SELECT partner_id, currency_id, current, b_1_30, b_30_60, b_60_90,
-                            b_90_120, b_over_120,
-                            current+b_1_30+b_30_60+b_60_90+b_90_120+b_over_120
-                            AS balance
-        FROM Q4
-        GROUP BY partner_id, currency_id, current, b_1_30, b_30_60, b_60_90,
-        b_90_120, b_over_120""" % (
-            self._show_buckets_sql_q1_payable(partners, date_end),
-            self._show_buckets_sql_q2_payable(
-                bucket_dates['today'],
-                bucket_dates['minus_30'],
-                bucket_dates['minus_60'],
-                bucket_dates['minus_90'],
-                bucket_dates['minus_120']),
-            self._show_buckets_sql_q3_payable(company_id),
-            self._show_buckets_sql_q4_payable()))
-        for row in self.env.cr.dictfetchall():
-            row['balance'] = float(row['balance'])
-            res[row.pop('partner_id')].append(row)
-        return res
-
-    def _get_account_show_buckets_receivable_and_payable(self, company_id, partner_ids, date_end):
-        res = dict(map(lambda x: (x, []), partner_ids))
-        partners = ', '.join([str(i) for i in partner_ids])
-        date_end = self._to_date(date_end)
-        bucket_dates = self._get_bucket_dates()
-        self.env.cr.execute("""WITH Q1 AS (%s), Q2 AS (%s),
-        Q3 AS (%s), Q4 AS (%s)
-        SELECT partner_id, currency_id, current, b_1_30, b_30_60, b_60_90,
-                            b_90_120, b_over_120,
-                            current+b_1_30+b_30_60+b_60_90+b_90_120+b_over_120
-                            AS balance
-        FROM Q4
-        GROUP BY partner_id, currency_id, current, b_1_30, b_30_60, b_60_90,
-        b_90_120, b_over_120""" % (
-            self._show_buckets_sql_q1_receivable_and_payable(partners, date_end),
-            self._show_buckets_sql_q2_receivable_and_payable(
-                bucket_dates['today'],
-                bucket_dates['minus_30'],
-                bucket_dates['minus_60'],
-                bucket_dates['minus_90'],
-                bucket_dates['minus_120']),
-            self._show_buckets_sql_q3_receivable_and_payable(company_id),
-            self._show_buckets_sql_q4_receivable_and_payable()))
+        params = self._get_statement_params(
+            company_id, partner_ids, date_start, date_end, account_types,
+            show_buckets=show_buckets)
+        # aging is relative to today, so a snapshot taken today for the
+        # statement end date gives the same buckets, unless it is stale
+        aging = self.env['customer.vendor.statement.aging']
+        use_snapshot = (
+            show_buckets
+            and params['date_end'] == params['today']
+            and aging._has_snapshot(company_id, params['date_end'])
+            and not aging._get_stale_partner_ids(
+                company_id, params['date_end'], partner_ids))
+        if use_snapshot:
+            params['show_buckets'] = False
+        self.env.cr.execute(self._statement_sql(use_snapshot), params)
         for row in self.env.cr.dictfetchall():
-            row['balance'] = float(row['balance'])
-            res[row.pop('partner_id')].append(row)
+            row_type = row['row_type']
+            values = {
+                name: row[name] for name in self._STATEMENT_ROW_FIELDS[row_type]
+            }
+            for name in self._STATEMENT_FLOAT_FIELDS:
+                if name in values:
+                    values[name] = float(values[name])
+            res[row_type][row['partner_id']].append(values)
         return res
 
     def _get_report_values(self, docids, data=None):
-        model = self.env.context.get('active_model')
         total_credit = 0
         total_debit = 0
         company_id = self.env.company.id
         partner_ids = data['partner_ids']
         date_start = data['date_start']
         date_end = data['date_end']
-        today = fields.Date.today()
-
-        if data['report_type'] == 'receivable':
-            balance_start_to_display, buckets_to_display = {}, {}
-            lines_to_display, amount_due = {}, {}
-            currency_to_display = {}
-            today_display, date_start_display, date_end_display = {}, {}, {}
-
-            balance_start = self._get_account_initial_balance(
-                company_id, partner_ids, date_start)
-
-            for partner_id in partner_ids:
-                balance_start_to_display[partner_id] = {}
-                for line in balance_start[partner_id]:
-                    currency = self.env['res.currency'].browse(line['currency_id'])
-                    if currency not in balance_start_to_display[partner_id]:
-                        balance_start_to_display[partner_id][currency] = []
-                    balance_start_to_display[partner_id][currency] = \
-                        float(line['balance'])
-
-            lines = self._get_account_display_lines(
-                company_id, partner_ids, date_start, date_end)
-            for partner_id in partner_ids:
-                lines_to_display[partner_id], amount_due[partner_id] = {}, {}
-                currency_to_display[partner_id] = {}
-                today_display[partner_id] = self._format_date_to_partner_lang(
-                    today, partner_id)
-                date_start_display[partner_id] = self._format_date_to_partner_lang(
-                    date_start, partner_id)
-                date_end_display[partner_id] = self._format_date_to_partner_lang(
-                    date_end, partner_id)
-                for line in lines[partner_id]:
-                    currency = self.env['res.currency'].browse(line['currency_id'])
-                    if currency not in lines_to_display[partner_id]:
-                        lines_to_display[partner_id][currency] = []
-                        currency_to_display[partner_id][currency] = currency
-                        if currency in balance_start_to_display[partner_id]:
-                            amount_due[partner_id][currency] = \
-                                balance_start_to_display[partner_id][currency]
-                        else:
-                            amount_due[partner_id][currency] = 0.0
-                    if True:  # blocked field removed in Odoo 19
-                        amount_due[partner_id][currency] += line['amount']
-                    line['balance'] = amount_due[partner_id][currency]
-                    total_credit += line['credit']
-                    total_debit += line['debit']
-                    line['date'] = self._format_date_to_partner_lang(
-                        line['date'], partner_id)
-                    line['date_maturity'] = self._format_date_to_partner_lang(
-                        line['date_maturity'], partner_id)
-                    lines_to_display[partner_id][currency].append(line)
-
-            if data['show_aging_buckets']:
-                buckets = self._get_account_show_buckets(
-                    company_id, partner_ids, date_end)
-                for partner_id in partner_ids:
-                    buckets_to_display[partner_id] = {}
-                    for line in buckets[partner_id]:
-                        currency = self.env['res.currency'].browse(
-                            line['currency_id'])
-                        if currency not in buckets_to_display[partner_id]:
-                            buckets_to_display[partner_id][currency] = []
-                        buckets_to_display[partner_id][currency] = line
-
-        if data['report_type'] == 'payable':
-            balance_start_to_display, buckets_to_display = {}, {}
-            lines_to_display, amount_due = {}, {}
-            currency_to_display = {}
-            today_display, date_start_display, date_end_display = {}, {}, {}
-
-            balance_start = self._get_account_initial_balance_payable(
-                company_id, partner_ids, date_start)
-
-            for partner_id in partner_ids:
-                balance_start_to_display[partner_id] = {}
-                for line in balance_start[partner_id]:
-                    currency = self.env['res.currency'].browse(line['currency_id'])
-                    if currency not in balance_start_to_display[partner_id]:
-                        balance_start_to_display[partner_id][currency] = []
-                    balance_start_to_display[partner_id][currency] = \
-                        float(line['balance'])
-
-            lines = self._get_account_display_lines_payable(
-                company_id, partner_ids, date_start, date_end)
-
-            for partner_id in partner_ids:
-                lines_to_display[partner_id], amount_due[partner_id] = {}, {}
-                currency_to_display[partner_id] = {}
-                today_display[partner_id] = self._format_date_to_partner_lang(
-                    today, partner_id)
-                date_start_display[partner_id] = self._format_date_to_partner_lang(
-                    date_start, partner_id)
-                date_end_display[partner_id] = self._format_date_to_partner_lang(
-                    date_end, partner_id)
-                for line in lines[partner_id]:
-                    currency = self.env['res.currency'].browse(line['currency_id'])
-                    if currency not in lines_to_display[partner_id]:
-                        lines_to_display[partner_id][currency] = []
-                        currency_to_display[partner_id][currency] = currency
-                        if currency in balance_start_to_display[partner_id]:
-                            amount_due[partner_id][currency] = \
-                                balance_start_to_display[partner_id][currency]
-                        else:
-                            amount_due[partner_id][currency] = 0.0
-                    if True:  # blocked field removed in Odoo 19
-                        amount_due[partner_id][currency] += line['amount']
-                    line['balance'] = amount_due[partner_id][currency]
-                    line['date'] = self._format_date_to_partner_lang(
-                        line['date'], partner_id)
-                    line['date_maturity'] = self._format_date_to_partner_lang(
-                        line['date_maturity'], partner_id)
-                    lines_to_display[partner_id][currency].append(line)
-
-            if data['show_aging_buckets']:
-                buckets = self._get_account_show_buckets_payable(
-                    company_id, partner_ids, date_end)
-                for partner_id in partner_ids:
-                    buckets_to_display[partner_id] = {}
-                    for line in buckets[partner_id]:
-                        currency = self.env['res.currency'].browse(
-                            line['currency_id'])
-                        if currency not in buckets_to_display[partner_id]:
-                            buckets_to_display[partner_id][currency] = []
-                        buckets_to_display[partner_id][currency] = line
-
-        if data['report_type'] == 'receivable_and_payable':
-            balance_start_to_display, buckets_to_display = {}, {}
-            lines_to_display, amount_due = {}, {}
-            currency_to_display = {}
-            today_display, date_start_display, date_end_display = {}, {}, {}
-
-            balance_start = self._get_account_initial_balance_receivable_and_payable(
-                company_id, partner_ids, date_start)
-
-            for partner_id in partner_ids:
-                balance_start_to_display[partner_id] = {}
-                for line in balance_start[partner_id]:
-                    currency = self.env['res.currency'].browse(line['currency_id'])
-                    if currency not in balance_start_to_display[partner_id]:
-                        balance_start_to_display[partner_id][currency] = []
-                    balance_start_to_display[partner_id][currency] = \
-                        float(line['balance'])
-
-            lines = self._get_account_display_lines_receivable_and_payable(
-                company_id, partner_ids, date_start, date_end)
-
-            for partner_id in partner_ids:
-                lines_to_display[partner_id], amount_due[partner_id] = {}, {}
-                currency_to_display[partner_id] = {}
-                today_display[partner_id] = self._format_date_to_partner_lang(
-                    today, partner_id)
-                date_start_display[partner_id] = self._format_date_to_partner_lang(
-                    date_start, partner_id)
-                date_end_display[partner_id] = self._format_date_to_partner_lang(
-                    date_end, partner_id)
-                for line in lines[partner_id]:
-                    currency = self.env['res.currency'].browse(line['currency_id'])
-                    if currency not in lines_to_display[partner_id]:
-                        lines_to_display[partner_id][currency] = []
-                        currency_to_display[partner_id][currency] = currency
-                        if currency in balance_start_to_display[partner_id]:
-                            amount_due[partner_id][currency] = \
-                                balance_start_to_display[partner_id][currency]
-                        else:
-                            amount_due[partner_id][currency] = 0.0
-                    if True:  # blocked field removed in Odoo 19
-                        amount_due[partner_id][currency] += line['amount']
-                    line['balance'] = amount_due[partner_id][currency]
-                    total_credit += line['credit']
-                    total_debit += line['debit']
-                    line['date'] = self._format_date_to_partner_lang(
-                        line['date'], partner_id)
-                    line['date_maturity'] = self._format_date_to_partner_lang(
-                        line['date_maturity'], partner_id)
-                    lines_to_display[partner_id][currency].append(line)
-
-            if data['show_aging_buckets']:
-                buckets = self._get_account_show_buckets_receivable_and_payable(
-                    company_id, partner_ids, date_end)
-                for partner_id in partner_ids:
-                    buckets_to_display[partner_id] = {}
-                    for line in buckets[partner_id]:
-                        currency = self.env['res.currency'].browse(
-                            line['currency_id'])
-                        if currency not in buckets_to_display[partner_id]:
-                            buckets_to_display[partner_id][currency] = []
-                        buckets_to_display[partner_id][currency] = line
+        today = fields.Date.context_today(self)
+        statement = self._get_statement_data(
+            company_id, partner_ids, date_start, date_end,
+            self._get_statement_account_types(data['report_type']),
+            show_buckets=data['show_aging_buckets'])
+        currencies = self._get_statement_currencies(statement)
+        format_date = self._get_partner_date_formatter(partner_ids)
+
+        balance_start_to_display, buckets_to_display = {}, {}
+        lines_to_display, amount_due = {}, {}
+        currency_to_display = {}
+        today_display, date_start_display, date_end_display = {}, {}, {}
+
+        for partner_id in partner_ids:
+            balance_start_to_display[partner_id] = {
+                currencies[line['currency_id']]: line['balance']
+                for line in statement['balance'][partner_id]
+            }
+            buckets_to_display[partner_id] = {
+                currencies[line['currency_id']]: line
+                for line in statement['bucket'][partner_id]
+            }
+            lines_to_display[partner_id], amount_due[partner_id] = {}, {}
+            currency_to_display[partner_id] = {}
+            today_display[partner_id] = format_date(today, partner_id)
+            date_start_display[partner_id] = format_date(date_start, partner_id)
+            date_end_display[partner_id] = format_date(date_end, partner_id)
+            for line in statement['line'][partner_id]:
+                currency = currencies[line['currency_id']]
+                if currency not in lines_to_display[partner_id]:
+                    lines_to_display[partner_id][currency] = []
+                    currency_to_display[partner_id][currency] = currency
+                    amount_due[partner_id][currency] = \
+                        balance_start_to_display[partner_id].get(currency, 0.0)
+                amount_due[partner_id][currency] += line['amount']
+                line['balance'] = amount_due[partner_id][currency]
+                total_credit += line['credit']
+                total_debit += line['debit']
+                line['date'] = format_date(line['date'], partner_id)
+                line['date_maturity'] = format_date(
+                    line['date_maturity'], partner_id)
+                lines_to_display[partner_id][currency].append(line)
 
         docargs = {
             'doc_ids': partner_ids,
@@ -0,0 +1 @@
+from . import test_customer_vendor_statement_aging
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestCustomerVendorStatementAging(AccountTestInvoicingCommon):
+    """Test cases for the aging buckets read from the snapshot"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.aging = cls.env['customer.vendor.statement.aging']
+        cls.statement = cls.env['report.customer_vendor_statement.statement']
+        cls.today = fields.Date.context_today(cls.statement)
+        cls.invoices = cls.env['account.move']
+        for days, amount in [(0, 100.0), (45, 200.0), (100, 300.0), (150, 400.0)]:
+            cls.invoices |= cls.init_invoice(
+                'out_invoice',
+                partner=cls.partner_a,
+                invoice_date=cls.today - timedelta(days=days),
+                amounts=[amount],
+                post=True,
+            )
+        cls._register_payment(cls.invoices[1], 50.0)
+
+    @classmethod
+    def _register_payment(cls, invoice, amount):
+        cls.env['account.payment.register'].with_context(
+            active_model='account.move', active_ids=invoice.ids,
+        ).create({'amount': amount})._create_payments()
+
+    def _get_statement_data(self):
+        """Return the statement data of partner_a and whether its buckets
+        were read from the snapshot."""
+        statement_class = type(self.statement)
+        with patch.object(
+            statement_class, '_statement_sql', autospec=True,
+            side_effect=statement_class._statement_sql,
+        ) as statement_sql:
+            data = self.statement._get_statement_data(
+                self.env.company.id, self.partner_a.ids,
+                self.today - timedelta(days=365), self.today,
+                ['asset_receivable'], show_buckets=True)
+        return data, statement_sql.call_args.args[1]
+
+    def test_01_snapshot_matches_live(self):
+        self.aging._refresh(self.env.company, self.today)
+        snapshot_data, use_snapshot = self._get_statement_data()
+        self.assertTrue(use_snapshot)
+        self.assertTrue(snapshot_data['bucket'][self.partner_a.id])
+        self.aging.search([]).unlink()
+        live_data, use_snapshot = self._get_statement_data()
+        self.assertFalse(use_snapshot)
+        self.assertEqual(snapshot_data, live_data)
+
+    def test_02_stale_snapshot(self):
+        company_id = self.env.company.id
+        self.aging._refresh(self.env.company, self.today)
+        self.assertFalse(self.aging._get_stale_partner_ids(company_id, self.today))
+        # the reconciliation only recomputes the residual of the lines
+        self._register_payment(self.invoices[2], 120.0)
+        self.assertEqual(
+            self.aging._get_stale_partner_ids(company_id, self.today),
+            self.partner_a.ids,
+        )
+        live_data, use_snapshot = self._get_statement_data()
+        self.assertFalse(use_snapshot)
+        with patch.object(
+            type(self.aging), '_get_snapshot_dates', return_value={self.today},
+        ):
+            self.aging._cron_refresh_snapshot()
+        self.assertFalse(self.aging._get_stale_partner_ids(company_id, self.today))
+        snapshot_data, use_snapshot = self._get_statement_data()
+        self.assertTrue(use_snapshot)
+        self.assertEqual(snapshot_data, live_data)
@@ -3,8 +3,17 @@
 #   (http://www.eficent.com)
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
+import logging
+import mmap
+import os
+import tempfile
 from datetime import date, datetime, timedelta
-from odoo import api, fields, models
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from odoo import _, api, fields, models
+from odoo.tools import split_every
+
+_logger = logging.getLogger(__name__)
 
 
 class CustomervendorStatementWizard(models.TransientModel):
@@ -25,7 +34,7 @@ class CustomervendorStatementWizard(models.TransientModel):
     )
     date_end = fields.Date(
         required=True,
-        default=fields.Date.today
+        default=fields.Date.context_today
     )
     show_aging_buckets = fields.Boolean(
         string='Include Aging Buckets',
@@ -48,6 +57,13 @@ class CustomervendorStatementWizard(models.TransientModel):
         default="receivable",
         required=True
     )
+    batch_size = fields.Integer(
+        string='Partners per Batch',
+        default=200,
+        help="When more partners than this are selected, statements are "
+             "rendered batch by batch and downloaded as a ZIP of PDFs. "
+             "Set to 0 to always render a single PDF."
+    )
 
     def button_export_pdf(self):
         self.ensure_one()
@@ -68,5 +84,64 @@ class CustomervendorStatementWizard(models.TransientModel):
     def _export(self):
         """Export to PDF."""
         data = self.read(['date_start', 'date_end', 'report_type', 'show_aging_buckets', 'filter_partners_non_due'])[0]
-        data.update({'partner_ids': self._context.get('active_ids', [])})
+        partner_ids = self._context.get('active_ids', [])
+        data.update({'partner_ids': partner_ids})
+        if self.batch_size > 0 and len(partner_ids) > self.batch_size:
+            return self._export_batched(data)
         return self.env.ref('customer_vendor_statement.action_print_customer_vendor_statement').report_action(self, data=data)
+
+    def _export_batched(self, data):
+        """Render the statement one batch of partners at a time and add
+        each PDF to a ZIP on disk, so only one batch is held in memory."""
+        report = self.env.ref('customer_vendor_statement.action_print_customer_vendor_statement')
+        partner_ids = data['partner_ids']
+        total, done = len(partner_ids), 0
+        with tempfile.TemporaryFile() as zip_file:
+            with ZipFile(zip_file, 'w', compression=ZIP_DEFLATED) as archive:
+                for index, batch in enumerate(split_every(self.batch_size, partner_ids, list), 1):
+                    batch_data = dict(data, partner_ids=batch)
+                    content, _report_format = self.env['ir.actions.report']._render_qweb_pdf(
+                        report, res_ids=batch, data=batch_data)
+                    archive.writestr('statement_%03d.pdf' % index, content)
+                    done += len(batch)
+                    _logger.info('Customer/vendor statement: %s/%s partners rendered', done, total)
+                    self._notify_export_progress(done, total)
+                    # drop the rendered partners from the cache before the next batch
+                    self.env.invalidate_all()
+            attachment = self._create_attachment_from_file(
+                'Customer Vendor Statements.zip', zip_file, 'application/zip')
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % attachment.id,
+            'target': 'self',
+        }
+
+    def _notify_export_progress(self, done, total):
+        """Notify the user of the progress of a batched export. The
+        notification is sent from its own transaction, the export one is only
+        committed once every batch is rendered."""
+        with self.env.registry.cursor() as cr:
+            self.env(cr=cr).user._bus_send('simple_notification', {
+                'type': 'info',
+                'title': _('Customer / Vendor Statement'),
+                'message': _('%(done)s/%(total)s partners rendered', done=done, total=total),
+            })
+
+    def _create_attachment_from_file(self, name, file, mimetype):
+        """Create an attachment of the wizard with the content of ``file``.
+        Unless attachments are stored in the database, the file is given to
+        the attachment mapped in memory, so that its content is read from
+        the disk by the storage instead of being loaded in memory."""
+        Attachment = self.env['ir.attachment']
+        values = {
+            'name': name,
+            'mimetype': mimetype,
+            'res_model': self._name,
+            'res_id': self.id,
+        }
+        file.seek(0)
+        if Attachment._storage() == 'db' or not os.fstat(file.fileno()).st_size:
+            return Attachment.create(dict(values, raw=file.read()))
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as raw:
+                return Attachment.create(dict(values, raw=raw))
@@ -2,7 +2,7 @@
 
 {
     'name': "Dynamic Product Page Label (modified)",
-    'version': '19.0.1.0.0',
+    'version': '19.0.1.0.1',
     'category': 'Product',
     'license': 'LGPL-3',
     'description': """Dynamic Product Page Label.""",
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import SUPERUSER_ID, api
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Create the QWeb view of the designs saved before they had one"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    designs = env['product.page.label.design'].with_context(active_test=False).search([
+        ('template_view_id', '=', False), ('page_template_design', '!=', False)])
+    for design in designs:
+        try:
+            with cr.savepoint():
+                design._sync_template_view()
+        except Exception:
+            _logger.warning('Cannot create the view of the label design %s', design.display_name,
+                            exc_info=True)
@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 from . import wizard_report
 from . import dynamic_report
+from . import ir_actions_report
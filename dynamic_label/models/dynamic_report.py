@@ -2,12 +2,86 @@
 from odoo import models, api, _
 from reportlab.graphics.barcode import createBarcodeDrawing
 from base64 import b64encode
-import math
-from reportlab.graphics import barcode
+from reportlab.graphics import barcode, shapes
 from odoo.exceptions import ValidationError
 from binascii import hexlify
-from markupsafe import Markup
+from markupsafe import Markup, escape
+from collections import OrderedDict
+import hashlib
+import threading
 
+BARCODE_CACHE_MAX_SIZE = 32 * 1024 * 1024  # bytes
+
+
+class BarcodeImageCache(object):
+    """LRU cache of base64 encoded barcode images bounded by their size"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, render):
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+        image = render()
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = image
+                self.size += len(image)
+            while self.size > self.max_size and self._images:
+                _key, evicted = self._images.popitem(last=False)
+                self.size -= len(evicted)
+        return image
+
+
+barcode_image_cache = BarcodeImageCache(BARCODE_CACHE_MAX_SIZE)
+
+SVG_TEXT_ANCHORS = {'start': 'start', 'middle': 'middle', 'end': 'end', 'numeric': 'end'}
+
+
+def _svg_number(value):
+    return ('%.2f' % (round(value, 2) + 0.0)).rstrip('0').rstrip('.')
+
+
+def drawing_to_svg(drawing):
+    """Convert a barcode drawing into compact SVG markup.
+
+    All the bars are merged into a single path in the coordinates of the
+    drawing (y axis pointing down), the human readable strings are kept as
+    text elements.
+    """
+    height = drawing.height
+    bars = []
+    texts = []
+
+    def walk(node, transform):
+        for child in node.contents:
+            if isinstance(child, shapes.Group):
+                walk(child, shapes.mmult(transform, child.transform))
+            elif isinstance(child, shapes.Rect) and child.fillColor is not None:
+                a, b, c, d, e, f = transform
+                x0, x1 = sorted((a * child.x + e, a * (child.x + child.width) + e))
+                y0, y1 = sorted((height - (d * child.y + f), height - (d * (child.y + child.height) + f)))
+                bars.append('M%s %sh%sv%sh-%sz' % (
+                    _svg_number(x0), _svg_number(y0), _svg_number(x1 - x0),
+                    _svg_number(y1 - y0), _svg_number(x1 - x0)))
+            elif isinstance(child, shapes.String) and child.text:
+                a, b, c, d, e, f = transform
+                texts.append(
+                    '<text transform="matrix(%s) translate(%s %s) scale(1 -1)" font-family="%s" '
+                    'font-size="%s" text-anchor="%s">%s</text>' % (
+                        ' '.join(_svg_number(v) for v in (a, -b, c, -d, e, height - f)),
+                        _svg_number(child.x), _svg_number(child.y), escape(child.fontName),
+                        _svg_number(child.fontSize), SVG_TEXT_ANCHORS.get(child.textAnchor, 'start'),
+                        escape(child.text)))
+
+    walk(drawing.expandUserNodes(), tuple(drawing.transform))
+    return '<path d="%s"/>%s' % (''.join(bars), ''.join(texts))
 
 
 class dynamic_report_temp(models.AbstractModel):
@@ -19,6 +93,7 @@ class dynamic_report_temp(models.AbstractModel):
         report_obj = self.env['ir.actions.report']
         report = report_obj._get_report_from_name('dynamic_label.dynamic_report_temp').with_context(
             {'lang': self.env.user.lang})
+        drawn_barcodes = set()
         docargs = {
             'doc_ids': self.env["wizard.product.page.report"].browse(data["ids"]).with_context(
                 {'lang': self.env.user.lang}),
@@ -26,14 +101,13 @@ class dynamic_report_temp(models.AbstractModel):
             'doc_model': report.model,
             'docs': self,
             'draw_table': self._draw_table,
-            'get_barcode': self._get_barcode,
+            'get_barcode': lambda product, barcode, data: self._get_barcode(
+                product, barcode, data, drawn_barcodes),
             'draw_style': self._draw_style,
             'data': data
         }
         if data['form']['with_barcode'] and data['form']['barcode_field']:
             for product in self.env['product.page.label.qty'].browse(data['form']['product_ids']):
-                width = int(data['form']['barcode_height'])
-                height = int(data['form']['barcode_width'])
                 barcode_field = product.product_id.read([str(data['form']['barcode_field'])])
                 if barcode_field:
                     barcode_field = barcode_field[0].get(str(data['form']['barcode_field']))
@@ -41,10 +115,8 @@ class dynamic_report_temp(models.AbstractModel):
                         raise ValidationError(
                             'Select valid barcode type according barcode field value or check barcode value !')
                 try:
-                     createBarcodeDrawing(
-                        data['form']['barcode_type'], value=barcode_field, format='png', width=width, height=height,
-                        humanReadable=data['form']['humanReadable'])
-                except:
+                    self._render_barcode(barcode_field, data)
+                except Exception:
                     raise ValidationError('Select valid barcode type according barcode field value !')
         return docargs
         # return report_obj.render('dynamic_label.dynamic_report_temp', docargs)
@@ -57,65 +129,98 @@ class dynamic_report_temp(models.AbstractModel):
         return ((from_row - 1) * col_no + from_col - 1)
 
     def _draw_table(self, data):
-        design = self.env['product.page.label.design'].browse(data['form']['design_id'][0])
-        product_list = []
+        """Return the rows of the label table, generated one at a time"""
         if data['form']['product_ids']:
             cell_no = self.get_cell_number(data['form']['from_row'], data['form']['from_col'],
                                            int(data['form']['col_no']))
-            box_needed = int(cell_no) or 0
-            for product_data in self.env['product.page.label.qty'].browse(data['form']['product_ids']):
-                if product_data.product_id:
-                    box_needed += int(product_data.qty)
-                    product_list.append(product_data)
-            cell_record = self.create_list(product_list, int(cell_no))
-            _table = self.create_table(box_needed, cell_record, data)
-            return _table
-
-    def _get_barcode(self, product, barcode, data):
+            products = self.env['product.page.label.qty'].browse(data['form']['product_ids'])
+            return self.iter_table_rows(self.iter_cells(products, int(cell_no)), int(data['form']['col_no']))
+
+    def _get_barcode_image(self, barcode_value, data):
+        """Return the base64 encoded PNG of the barcode, each distinct barcode
+        is only drawn once and shared by all the labels printing it"""
+        barcode_type = data['form']['barcode_type']
+        width = int(data['form']['barcode_height'])
+        height = int(data['form']['barcode_width'])
+        human_readable = data['form']['humanReadable']
+
+        def render():
+            barcode_drawing = createBarcodeDrawing(
+                barcode_type, value=barcode_value, format='png',
+                width=width, height=height, humanReadable=human_readable)
+            return b64encode(barcode_drawing.asString('png')).decode('utf-8')
+
+        return barcode_image_cache.get(
+            (barcode_type, barcode_value, width, height, bool(human_readable)), render)
+
+    def _get_barcode_svg(self, barcode_value, data):
+        """Return the id and the SVG markup of the barcode, drawn once per
+        distinct barcode like the PNG images"""
+        key = ('svg', data['form']['barcode_type'], barcode_value, int(data['form']['barcode_height']),
+               int(data['form']['barcode_width']), bool(data['form']['humanReadable']))
+
+        def render():
+            return drawing_to_svg(createBarcodeDrawing(
+                key[1], value=barcode_value, width=key[3], height=key[4], humanReadable=key[5]))
+
+        return 'barcode-%s' % hashlib.sha1(repr(key).encode()).hexdigest()[:16], \
+            barcode_image_cache.get(key, render)
+
+    def _render_barcode(self, barcode_value, data):
+        if data['form'].get('barcode_format') == 'svg':
+            return self._get_barcode_svg(barcode_value, data)
+        return self._get_barcode_image(barcode_value, data)
+
+    def _get_barcode(self, product, barcode, data, drawn_barcodes=None):
         barcode_str = ''
         if data['form']['with_barcode']:
-            barcode_value = product.read([barcode])
-            if barcode_value:
-                barcode_value = barcode_value[0].get(barcode)
-            barcode_drawing = createBarcodeDrawing(
-                data['form']['barcode_type'], value=barcode_value, format='png',
-                width=int(data['form']['barcode_height']),
-                height=int(data['form']['barcode_width']), humanReadable=data['form']['humanReadable'])
-            barcode_png = barcode_drawing.asString('png')
+            barcode_value = product[barcode]
+            if data['form'].get('barcode_format') == 'svg':
+                return self._get_barcode_svg_markup(barcode_value, data, drawn_barcodes)
             # Use Markup to mark HTML as safe for t-out rendering in Odoo 19
             barcode_str = Markup("<img style='width:{width}px;height:{height}px;' src='data:image/png;base64,{b64}'/>".format(
                 width=data['form']['display_width'],
                 height=data['form']['display_height'],
-                b64=b64encode(barcode_png).decode('utf-8')
+                b64=self._get_barcode_image(barcode_value, data)
             ))
         return barcode_str
 
-    def create_list(self, products, cell_no):
-        product_data = {}
+    def _get_barcode_svg_markup(self, barcode_value, data, drawn_barcodes=None):
+        """Return the inline SVG of the barcode, its paths are only written for
+        the first label of the report and referenced by the next ones"""
+        barcode_id, svg = self._get_barcode_svg(barcode_value, data)
+        if drawn_barcodes is None or barcode_id not in drawn_barcodes:
+            if drawn_barcodes is not None:
+                drawn_barcodes.add(barcode_id)
+            content = Markup('<g id="{}">{}</g>').format(barcode_id, Markup(svg))
+        else:
+            content = Markup('<use xlink:href="#{}"/>').format(barcode_id)
+        return Markup(
+            '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            'style="width:{}px;height:{}px;" viewBox="0 0 {} {}" preserveAspectRatio="none">{}</svg>'
+        ).format(data['form']['display_width'], data['form']['display_height'],
+                 int(data['form']['barcode_height']), int(data['form']['barcode_width']), content)
+
+    def iter_cells(self, products, cell_no):
+        """Yield the product of each cell of the table, False for the cell_no
+        cells skipped before the start position"""
+        for _cell in range(cell_no):
+            yield False
         for prod in products:
             if prod.product_id:
-                for qty in range(0, int(prod.qty)):
-                    product_data.update({cell_no: {'product_id': prod.product_id}})
-                    cell_no += 1
-        return product_data
-
-    def create_table(self, box_needed, cell_record, data):
-        no_of_col = int(data['form']['col_no'])
-        product_table = []
-        for tr_no in range(1, int(math.ceil(float(box_needed) / no_of_col + 1))):
-            product_dict = {}
-            for td_no in range(1, no_of_col + 1):
-                cellno = self.get_cell_number(tr_no, td_no, no_of_col)
-                if cell_record.get(cellno):
-                    product_id = cell_record.get(cellno).get('product_id')
-                    if product_dict.get(tr_no):
-                        product_dict[tr_no].append(product_id)
-                    else:
-                        product_dict[tr_no] = [product_id]
-                else:
-                    if product_dict.get(tr_no):
-                        product_dict[tr_no].append(False)
-                    else:
-                        product_dict[tr_no] = [False]
-            product_table.append(product_dict)
-        return product_table
+                for _qty in range(int(prod.qty)):
+                    yield prod.product_id
+
+    def iter_table_rows(self, cells, no_of_col):
+        """Yield the rows of no_of_col cells as {row number: cells}, the last
+        row being completed with blank cells"""
+        tr_no = 1
+        row = []
+        for cell in cells:
+            row.append(cell)
+            if len(row) == no_of_col:
+                yield {tr_no: row}
+                tr_no += 1
+                row = []
+        if row:
+            yield {tr_no: row + [False] * (no_of_col - len(row))}
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+DYNAMIC_LABEL_REPORT = 'dynamic_label.dynamic_report_temp'
+
+PAPERFORMAT_FIELDS = ['format', 'page_width', 'page_height', 'orientation', 'margin_top',
+                      'margin_left', 'margin_bottom', 'margin_right', 'dpi']
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    def _get_dynamic_label_paperformat(self, form):
+        """Return the values of the paper format chosen in the label wizard"""
+        values = self.paperformat_id.copy_data()[0] if self.paperformat_id else {}
+        values.update({field: form[field] for field in PAPERFORMAT_FIELDS if field in form})
+        if values.get('format') != 'custom':
+            values.update({'page_width': 0, 'page_height': 0})
+        return values
+
+    def get_paperformat(self):
+        # the label paper format is given per rendering instead of being
+        # written on the shared report.paperformat record
+        values = self.env.context.get('dynamic_label_paperformat')
+        if values and self.report_name == DYNAMIC_LABEL_REPORT:
+            return self.env['report.paperformat'].new(values)
+        return super(IrActionsReport, self).get_paperformat()
+
+    def _render_qweb_pdf(self, report_ref, res_ids=None, data=None):
+        report = self._get_report(report_ref)
+        if report.report_name == DYNAMIC_LABEL_REPORT and data and data.get('form'):
+            self = self.with_context(
+                dynamic_label_paperformat=report._get_dynamic_label_paperformat(data['form']))
+        return super(IrActionsReport, self)._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
+
+    def _get_dynamic_label_wizard(self, data):
+        """Return the label wizard being printed. The design is read from the
+        wizard record, not from the report data sent back by the client."""
+        wizard_ids = data.get('ids') or self.env.context.get('active_ids') or []
+        return self.env['wizard.product.page.report'].browse(wizard_ids[:1]).exists()
+
+    def _render_template(self, template, values=None):
+        if template == DYNAMIC_LABEL_REPORT and values and values.get('data', {}).get('form'):
+            wizard = self._get_dynamic_label_wizard(values['data'])
+            template = self.env['product.page.label.design']._get_label_template(wizard) or template
+        return super(IrActionsReport, self)._render_template(template, values=values)
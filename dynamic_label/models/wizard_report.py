@@ -1,6 +1,7 @@
 from odoo import fields, models, api, _
 from odoo.exceptions import UserError, ValidationError
 from stdnum import ean
+from lxml import etree
 
 paper_format_dict = {'A0': [841, 1189], 'A1': [594, 841], 'A2': [420, 594], 'A3': [297, 420], 'A4': [210, 297],
                      'A5': [148, 210], 'A6': [105, 148], 'A7': [74, 105], 'A8': [52, 74], 'A9': [37, 52],
@@ -28,6 +29,7 @@ class product_page_label_design(models.Model):
                             'margin_left': wiz.margin_left, 'margin_bottom': wiz.margin_bottom,
                             'margin_right': wiz.margin_right, 'orientation': wiz.orientation,
                             'barcode_type': wiz.barcode_type, 'humanReadable': wiz.humanReadable,
+                            'barcode_format': wiz.barcode_format,
                             'barcode_height': wiz.barcode_height, 'barcode_width': wiz.barcode_width,
                             'display_height': wiz.display_height, 'display_width': wiz.display_width,
                             'with_barcode': wiz.with_barcode, 'format': wiz.format,
@@ -69,6 +71,9 @@ class product_page_label_design(models.Model):
                                      ('I2of5', 'I2of5'), ('UPCA', 'UPCA'),
                                      ('QR', 'QR')],
                                     string='Type', default='EAN13', required=True)
+    barcode_format = fields.Selection([('png', 'PNG Image'), ('svg', 'SVG Vector')], string="Barcode Format",
+                                      default='png', required=True,
+                                      help="SVG barcodes stay sharp at any DPI and make lighter reports.")
     humanReadable = fields.Boolean(string="HumanReadable", help="User wants to print barcode number\
                                     with barcode page label.")
     barcode_height = fields.Integer(string="Height", default=300, required=True, help="This height will\
@@ -126,6 +131,60 @@ class product_page_label_design(models.Model):
     from_row = fields.Integer(string="Start Row", default=1)
     active = fields.Boolean(string="Active", default=True)
     barcode_field = fields.Selection('_get_barcode_field', string="Barcode Field")
+    template_view_id = fields.Many2one('ir.ui.view', string="Design View", readonly=True, copy=False,
+                                       ondelete='set null')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        designs = super(product_page_label_design, self).create(vals_list)
+        designs._sync_template_view()
+        return designs
+
+    def write(self, vals):
+        res = super(product_page_label_design, self).write(vals)
+        if 'page_template_design' in vals:
+            self._sync_template_view()
+        return res
+
+    def unlink(self):
+        views = self.sudo().template_view_id
+        res = super(product_page_label_design, self).unlink()
+        views.unlink()
+        return res
+
+    def _sync_template_view(self):
+        """Store the design in a QWeb view of its own.
+
+        Labels are rendered from this view, so the design is compiled once and
+        kept in the QWeb cache until the design itself is modified.
+        """
+        for design in self:
+            view = design.sudo().template_view_id
+            if not design.page_template_design:
+                continue
+            if view:
+                view.write({'arch': design.page_template_design})
+            else:
+                design.template_view_id = self.env['ir.ui.view'].sudo().create({
+                    'name': 'dynamic_label_design_%s' % design.id,
+                    'type': 'qweb',
+                    'key': 'dynamic_label.page_label_design_%s' % design.id,
+                    'arch': design.page_template_design,
+                })
+
+    @api.model
+    def _get_label_template(self, wizard):
+        """Return the QWeb template printing the labels of the wizard"""
+        arch = wizard.column_report_design
+        design = wizard.design_id
+        view = design.sudo().template_view_id
+        if view and (not arch or arch == design.page_template_design):
+            return view.id
+        if not arch or arch == wizard.page_report_id.arch:
+            # default design, rendered from the report template itself
+            return False
+        # design only changed in the wizard, rendered without being cached
+        return etree.fromstring(arch)
 
     def close_wizard(self):
         self.write({'active': False})
@@ -166,39 +225,37 @@ class wizard_report(models.TransientModel):
     _name = "wizard.product.page.report"
     _description = 'Wizard Product Page Report'
 
+    # model of the active documents: (line model, link to the document, quantity field)
+    _label_qty_sources = {
+        'purchase.order': ('purchase.order.line', 'order_id', 'product_qty'),
+        'sale.order': ('sale.order.line', 'order_id', 'product_uom_qty'),
+        'stock.picking': ('stock.move.line', 'picking_id', 'quantity'),
+    }
+
+    @api.model
+    def _get_label_qty_by_product(self, active_model, active_ids):
+        """Return the quantity of labels of each product of the active documents,
+        summed by the database"""
+        if active_model == 'product.product':
+            return {product.id: product.qty_available for product in self.env['product.product'].browse(active_ids)}
+        if active_model not in self._label_qty_sources:
+            return {}
+        line_model, document_field, qty_field = self._label_qty_sources[active_model]
+        return {
+            product.id: qty
+            for product, qty in self.env[line_model]._read_group(
+                [(document_field, 'in', active_ids), ('product_id', '!=', False)],
+                ['product_id'], ['%s:sum' % qty_field])
+        }
+
     @api.model
     def default_get(self, fields_list):
         prod_list = []
-        product_dict = {}
         res = super(wizard_report, self).default_get(fields_list)
-        if self._context.get('active_ids') and self._context.get('active_model') == 'purchase.order':
-            for line in self.env['purchase.order.line'].search([('order_id', 'in', self._context.get('active_ids'))]):
-                if line.product_id and product_dict.get(line.product_id.id):
-                    product_dict.update(
-                        {line.product_id.id: int(product_dict.get(line.product_id.id)) + int(line.product_qty)})
-                else:
-                    product_dict.update({line.product_id.id: line.product_qty})
-        elif self._context.get('active_ids') and self._context.get('active_model') == 'sale.order':
-            for line in self.env['sale.order.line'].search([('order_id', 'in', self._context.get('active_ids'))]):
-                if line.product_id and product_dict.get(line.product_id.id):
-                    product_dict.update(
-                        {line.product_id.id: int(product_dict.get(line.product_id.id)) + int(line.product_uom_qty)})
-                else:
-                    product_dict.update({line.product_id.id: line.product_uom_qty})
-        elif self._context.get('active_ids') and self._context.get('active_model') == 'stock.picking':
-            for line in self.env['stock.move.line'].search(
-                    [('picking_id', 'in', self._context.get('active_ids'))]):
-                if line.product_id and product_dict.get(line.product_id.id):
-                    product_dict.update(
-                        {line.product_id.id: int(product_dict.get(line.product_id.id)) + int(line.qty_done)})
-                else:
-                    product_dict.update({line.product_id.id: line.qty_done})
-        elif self._context.get('active_ids') and self._context.get('active_model') == 'product.product':
-            for line in self.env['product.product'].browse(self._context.get('active_ids')):
-                if line and product_dict.get(line.id):
-                    product_dict.update({line.id: int(product_dict.get(line.id))})
-                else:
-                    product_dict.update({line.id: line.qty_available})
+        product_dict = {}
+        if self._context.get('active_ids'):
+            product_dict = self._get_label_qty_by_product(self._context.get('active_model'),
+                                                          self._context.get('active_ids'))
         for product_id in product_dict:
             prod_list.append((0, 0, {'product_id': product_id, 'qty': product_dict[product_id]}))
         res['product_ids'] = prod_list
@@ -262,6 +319,7 @@ class wizard_report(models.TransientModel):
             # barcode args
             self.with_barcode = self.design_id.with_barcode
             self.barcode_type = self.design_id.barcode_type
+            self.barcode_format = self.design_id.barcode_format
             self.barcode_height = self.design_id.barcode_height
             self.barcode_width = self.design_id.barcode_width
             self.humanReadable = self.design_id.humanReadable
@@ -362,6 +420,9 @@ class wizard_report(models.TransientModel):
                                      ('I2of5', 'I2of5'), ('UPCA', 'UPCA'),
                                      ('QR', 'QR')],
                                     string='Type', default='EAN13', required=True)
+    barcode_format = fields.Selection([('png', 'PNG Image'), ('svg', 'SVG Vector')], string="Barcode Format",
+                                      default='png', required=True,
+                                      help="SVG barcodes stay sharp at any DPI and make lighter reports.")
     humanReadable = fields.Boolean(string="HumanReadable", help="User wants to print barcode number \
                                     with barcode label.")
     barcode_height = fields.Integer(string="Height", default=300, required=True,
@@ -464,33 +525,6 @@ class wizard_report(models.TransientModel):
             'dynamic_size': True,
             'data': data
         }
-        if self.page_report_id and self.column_report_design:
-            self.page_report_id.write({'arch': self.column_report_design})
-        if self.paper_format_id:
-            if self.format == 'custom':
-                self.paper_format_id.write({
-                    'format': self.format,
-                    'page_width': self.page_width,
-                    'page_height': self.page_height,
-                    'orientation': self.orientation,
-                    'margin_top': self.margin_top,
-                    'margin_left': self.margin_left,
-                    'margin_bottom': self.margin_bottom,
-                    'margin_right': self.margin_right,
-                    'dpi': self.dpi
-                })
-            else:
-                self.paper_format_id.write({
-                    'format': self.format,
-                    'page_width': 0,
-                    'page_height': 0,
-                    'orientation': self.orientation,
-                    'margin_top': self.margin_top,
-                    'margin_left': self.margin_left,
-                    'margin_bottom': self.margin_bottom,
-                    'margin_right': self.margin_right,
-                    'dpi': self.dpi
-                })
         return self.env.ref('dynamic_label.action_report_dynamic_report').report_action(self, data=datas)
 
     def save_design(self):
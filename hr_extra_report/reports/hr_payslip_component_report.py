@@ -1,3 +1,5 @@
+import uuid
+
 from odoo import _, models
 import toolz as T
 
@@ -7,8 +9,12 @@ class HrPayslipComponentReport(models.AbstractModel):
     _inherit = 'report.report_xlsx_dynamic.abstract'
     _description = "HR Payslip Report XLSX"
 
-    def get_report_body(self, form_data):
-        query = """
+    # the component export can span years of payslips: rows are flushed to
+    # disk while they are fetched from the database
+    _xlsx_constant_memory = True
+
+    def _get_report_body_query(self):
+        return """
         WITH
         PARTNER_BANK AS (
           SELECT DISTINCT ON (PARTNER_ID)
@@ -63,13 +69,51 @@ class HrPayslipComponentReport(models.AbstractModel):
         FROM MAIN_COMPONENT AS MC
         ORDER BY MC.PAYSLIP_DATE_FROM
         """
-        self.env.cr.execute(query, {
+
+    def _get_report_body_params(self, form_data):
+        return {
             'date_from': form_data['date_from'],
             'date_to': form_data['date_to']
-        })
+        }
+
+    def get_report_body(self, form_data):
+        self.env.cr.execute(
+            self._get_report_body_query(), self._get_report_body_params(form_data)
+        )
         result = self.env.cr.fetchall()
         return result
 
+    def _iter_report_body(self, form_data, batch_size=2000):
+        """Yield the rows of get_report_body, fetched by batches of batch_size
+        from a server-side cursor instead of loading the whole result.
+
+        The cursor is named per call so that several reports can be generated
+        in the same transaction. When a query fails, the transaction is
+        aborted and the cursor is dropped with it, so it is not closed then.
+        """
+        cr = self.env.cr
+        cursor_name = "payslip_component_%s" % uuid.uuid4().hex
+        cr.execute(
+            "DECLARE " + cursor_name + " NO SCROLL CURSOR FOR "
+            + self._get_report_body_query(),
+            self._get_report_body_params(form_data),
+        )
+        try:
+            while True:
+                cr.execute(
+                    "FETCH %(batch_size)s FROM " + cursor_name,
+                    {'batch_size': batch_size},
+                )
+                rows = cr.fetchall()
+                if not rows:
+                    break
+                yield from rows
+        except GeneratorExit:
+            # the rows are not all read, the transaction is still usable
+            cr.execute("CLOSE " + cursor_name)
+            raise
+        cr.execute("CLOSE " + cursor_name)
+
     def get_report_header(self):
         header = [
             "Date",
@@ -93,6 +137,6 @@ class HrPayslipComponentReport(models.AbstractModel):
 
     def generate_xlsx_report(self, workbook, form_data, docids):
         report_name = _('Payslip Report')
-        data = T.concatv([self.get_report_header()], self.get_report_body(form_data))
+        data = T.concatv([self.get_report_header()], self._iter_report_body(form_data))
         sheet = workbook.add_worksheet(report_name[:31])
         self.write_dynamic_report(sheet, data)
@@ -42,3 +42,24 @@ class HrPayslipReport(models.AbstractModel):
             },
         )
         return self.env.cr.dictfetchall()
+
+    @api.model
+    def _get_salary_rule_names(self, data):
+        """Names of the payslip lines of the report period, in the order of
+        their sequence, without loading the payslip lines.
+        """
+        self.env.cr.execute(
+            """
+            SELECT HRPL.NAME
+              FROM HR_PAYSLIP_LINE AS HRPL
+              JOIN HR_PAYSLIP AS HRP ON HRP.ID = HRPL.SLIP_ID
+              WHERE HRP.DATE_FROM >= %(date_from)s AND HRP.DATE_TO <= %(date_to)s
+              GROUP BY HRPL.NAME
+              ORDER BY MIN(HRPL.SEQUENCE), HRPL.NAME
+            """,
+            {
+                'date_from': data['date_from'],
+                'date_to': data['date_to'],
+            },
+        )
+        return [name for name, in self.env.cr.fetchall()]
@@ -11,9 +11,10 @@ class HrPayslipReportXlsx(models.AbstractModel):
     _description = "HR Payslip Report XLSX"
 
     def generate_xlsx_report(self, workbook, form_data, docids):
+        formats = {}
 
         def prepare_custom_cell(cell_value, colspan=1, rowspan=1, style=None):
-            cell_format = workbook.add_format(style or {})
+            cell_format = self.get_cell_format(workbook, formats, style)
             return {
                 'cell_value': cell_value,
                 'colspan': colspan,
@@ -36,12 +37,9 @@ class HrPayslipReportXlsx(models.AbstractModel):
         )
         report_qyery_result = self.env['report.hr_extra_report.hr_payslip_report']._prepare_report_data(
             docids, form_data)
-        available_salary_rules = T.pipe(
-            self.env['hr.payslip.line'].search([]),
-            TC.map(TC.get('name')),
-            TC.unique,
-            list,
-        )
+        available_salary_rules = self.env[
+            'report.hr_extra_report.hr_payslip_report'
+        ]._get_salary_rule_names(form_data)
         report_body = [
             [None],
             [None],
@@ -72,6 +72,23 @@ class TestHrPayslipReport(TransactionCase):
         result = self.report_model._prepare_report_data([], data)
         self.assertIsInstance(result, list)
 
+    def test_04_salary_rule_names_match_report_data(self):
+        """Test that the salary rule columns are the rule names of the period"""
+        data = {
+            'date_from': '2020-01-01',
+            'date_to': '2030-12-31',
+        }
+        names = self.report_model._get_salary_rule_names(data)
+        self.assertEqual(len(names), len(set(names)))
+        self.assertEqual(
+            set(names),
+            {
+                line['salary_rule_name']
+                for line in self.report_model._prepare_report_data([], data)
+                if line['salary_rule_name']
+            },
+        )
+
 
 @tagged('post_install', '-at_install')
 class TestHrPayslipReportXlsx(TransactionCase):
@@ -181,3 +198,29 @@ class TestHrPayslipComponentReport(TransactionCase):
             model._inherit if isinstance(model._inherit, list) else [model._inherit],
             "Should inherit from xlsx abstract report"
         )
+
+    def test_08_iter_report_body_matches_get_report_body(self):
+        """Test that streaming the body by batches returns the same rows"""
+        form_data = {
+            'date_from': '2020-01-01',
+            'date_to': '2030-12-31',
+        }
+        self.assertEqual(
+            list(self.report_model._iter_report_body(form_data, batch_size=1)),
+            self.report_model.get_report_body(form_data),
+        )
+
+    def test_09_iter_report_body_cursors_per_call(self):
+        """Test that bodies can be streamed together and their cursors are closed"""
+        form_data = {
+            'date_from': '2020-01-01',
+            'date_to': '2030-12-31',
+        }
+        body = self.report_model._iter_report_body(form_data, batch_size=1)
+        # the first cursor stays open while the second one is read
+        next(body, None)
+        other_body = self.report_model._iter_report_body(form_data, batch_size=1)
+        self.assertEqual(list(other_body), self.report_model.get_report_body(form_data))
+        body.close()
+        self.env.cr.execute("SELECT name FROM pg_cursors WHERE name LIKE 'payslip_component_%'")
+        self.assertFalse(self.env.cr.fetchall())
@@ -2,12 +2,14 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl)
 import json
 import mimetypes
+import os
 
 from werkzeug import exceptions
 from werkzeug.urls import url_parse
+from werkzeug.wsgi import wrap_file
 
 from odoo import http
-from odoo.http import content_disposition, request, route
+from odoo.http import Response, content_disposition, request, route
 from odoo.tools import html_escape
 
 from odoo.addons.web.controllers.report import ReportController
@@ -44,17 +46,29 @@ class ReportPy3oController(ReportController):
                 description="Py3o action report not found for report_name "
                 "%s" % reportname
             )
-        res, filetype = ir_action._render(reportname, docids, data)
-        filename = action_py3o_report.gen_report_download_filename(docids, data)
-        if not filename.endswith(filetype):
-            filename = "{}.{}".format(filename, filetype)
-        content_type = mimetypes.guess_type("x." + filetype)[0]
-        http_headers = [
-            ("Content-Type", content_type),
-            ("Content-Length", len(res)),
-            ("Content-Disposition", content_disposition(filename)),
-        ]
-        return request.make_response(res, headers=http_headers)
+        result_path, filetype = ir_action._render_py3o_file(reportname, docids, data)
+        # the file is removed from the disk right away but stays readable
+        # until the response is sent and closes it
+        result_file = open(result_path, "rb")
+        os.unlink(result_path)
+        try:
+            filename = action_py3o_report.gen_report_download_filename(docids, data)
+            if not filename.endswith(filetype):
+                filename = "{}.{}".format(filename, filetype)
+            content_type = mimetypes.guess_type("x." + filetype)[0]
+            http_headers = [
+                ("Content-Type", content_type),
+                ("Content-Length", os.fstat(result_file.fileno()).st_size),
+                ("Content-Disposition", content_disposition(filename)),
+            ]
+            return Response(
+                wrap_file(request.httprequest.environ, result_file),
+                headers=http_headers,
+                direct_passthrough=True,
+            )
+        except Exception:
+            result_file.close()
+            raise
 
     @route()
     def report_download(self, data, context=None, token=None, readonly=True):
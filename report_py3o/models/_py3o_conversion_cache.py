@@ -0,0 +1,141 @@
+# Copyright 2026 ACSONE SA/NV
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl)
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import Future
+
+from odoo import tools
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONVERSION_CACHE_SIZE = 256  # MB
+
+
+class Py3oConversionCache(object):
+    """Cache of converted documents stored in a directory of the filestore.
+
+    Entries are keyed by a hash of the rendered document and of the target
+    filetype. The least recently used entries are removed when the size of
+    the directory exceeds ``max_size``.
+    """
+
+    def __init__(self, path, max_size):
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(document_path, *args):
+        """Hash the content of a rendered ODF document.
+
+        The files of the archive are hashed rather than the archive itself
+        since their timestamps change at each rendering.
+        """
+        digest = hashlib.sha256(repr(args).encode())
+        with zipfile.ZipFile(document_path) as document:
+            for info in sorted(document.infolist(), key=lambda i: i.filename):
+                digest.update(info.filename.encode())
+                with document.open(info) as f:
+                    for chunk in iter(lambda: f.read(65536), b""):
+                        digest.update(chunk)
+        return digest.hexdigest()
+
+    def _get_entry_path(self, key):
+        return os.path.join(self.path, key)
+
+    def fetch(self, key, target_path):
+        """Copy the cached document to target_path, return False on miss"""
+        entry_path = self._get_entry_path(key)
+        try:
+            shutil.copyfile(entry_path, target_path)
+            # the modification time is used to evict the oldest entries
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return False
+        logger.debug("py3o conversion cache hit %s", key)
+        return True
+
+    def store(self, key, source_path):
+        os.makedirs(self.path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=".tmp.")
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, self._get_entry_path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total_size = 0
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_size += stat.st_size
+            entries.sort()
+            while entries and total_size > self.max_size:
+                _mtime, size, path = entries.pop(0)
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+
+    def store_on_success(self, future, key, converted_path):
+        """Return a future resolved once the successful conversion handled by
+        future has been stored in the cache.
+        """
+        cached_future = Future()
+
+        def done(future):
+            exception = future.exception()
+            if exception is not None:
+                cached_future.set_exception(exception)
+                return
+            try:
+                self.store(key, converted_path)
+            except OSError:
+                logger.warning("Cannot store py3o conversion %s", key, exc_info=True)
+            cached_future.set_result(future.result())
+
+        future.add_done_callback(done)
+        return cached_future
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_conversion_cache(dbname):
+    """Return the conversion cache of the database, configured from odoo.cfg"""
+    cache = _caches.get(dbname)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(dbname)
+            if cache is None:
+                size = tools.config.get_misc(
+                    "report_py3o",
+                    "conversion_cache_size",
+                    DEFAULT_CONVERSION_CACHE_SIZE,
+                )
+                cache = _caches[dbname] = Py3oConversionCache(
+                    os.path.join(
+                        tools.config.filestore(dbname), "py3o_conversion_cache"
+                    ),
+                    int(size) * 1024 * 1024,
+                )
+    return cache
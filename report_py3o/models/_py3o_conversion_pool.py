@@ -0,0 +1,352 @@
+# Copyright 2026 ACSONE SA/NV
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl)
+import atexit
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import tools
+
+logger = logging.getLogger(__name__)
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    from com.sun.star.connection import NoConnectException
+except ImportError:
+    logger.debug("Cannot import uno")
+    uno = None
+
+DEFAULT_CONVERSION_TIMEOUT = 120
+DEFAULT_WORKER_MAX_JOBS = 200
+
+# export filters by type of the loaded document and target format
+EXPORT_FILTERS = {
+    "com.sun.star.text.TextDocument": {
+        "doc": "MS Word 97",
+        "docx": "MS Word 2007 XML",
+        "pdf": "writer_pdf_Export",
+        "docbook": "DocBook File",
+        "html": "HTML (StarWriter)",
+        "odt": "writer8",
+    },
+    "com.sun.star.sheet.SpreadsheetDocument": {
+        "pdf": "calc_pdf_Export",
+        "html": "HTML (StarCalc)",
+        "ods": "calc8",
+        "xls": "MS Excel 97",
+    },
+}
+
+
+def _properties(**values):
+    properties = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        properties.append(prop)
+    return tuple(properties)
+
+
+class Py3oConversionWorker(object):
+    """A headless LibreOffice process and its user profile.
+
+    The office is started on first use, listening on a private pipe, and
+    documents are converted over a UNO connection to it, so that it is
+    started once for up to ``max_jobs`` conversions. It is restarted when it
+    died or when a conversion failed. Conversions run as a command, when
+    UNO is not available, only reuse the profile.
+    """
+
+    def __init__(self, max_jobs):
+        self.max_jobs = max_jobs
+        self.jobs = 0
+        self.user_installation = tempfile.mkdtemp(prefix="py3o.lo.profile.")
+        self.pipe_name = "py3o_lo_%s" % uuid.uuid4().hex
+        self.lo_bin = None
+        self.process = None
+        self.desktop = None
+
+    @property
+    def is_exhausted(self):
+        return bool(self.max_jobs) and self.jobs >= self.max_jobs
+
+    @property
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self, lo_bin, timeout):
+        """Start the office and connect to it"""
+        self.stop()
+        self.lo_bin = lo_bin
+        connection = (
+            "pipe,name=%s;urp;StarOffice.ComponentContext" % self.pipe_name
+        )
+        command = [
+            lo_bin,
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--nodefault",
+            "--norestore",
+            "--nolockcheck",
+            "--accept=%s" % connection,
+            "-env:UserInstallation=%s"
+            % uno.systemPathToFileUrl(self.user_installation),
+        ]
+        logger.debug("Starting office %s", command)
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                context = resolver.resolve("uno:%s" % connection)
+                break
+            except NoConnectException as e:
+                if not self.is_running or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError(
+                        "Cannot connect to the office started with %s" % lo_bin
+                    ) from e
+                time.sleep(0.1)
+        self.desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def convert(self, source_path, target_path, filetype):
+        """Convert the document at source_path into target_path"""
+        document = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(source_path),
+            "_blank",
+            0,
+            _properties(Hidden=True),
+        )
+        if document is None:
+            raise RuntimeError("Cannot load %s" % source_path)
+        try:
+            for service, filters in EXPORT_FILTERS.items():
+                if document.supportsService(service):
+                    break
+            else:
+                filters = {}
+            if filetype not in filters:
+                raise RuntimeError(
+                    "Cannot convert %s to %s" % (source_path, filetype)
+                )
+            document.storeToURL(
+                uno.systemPathToFileUrl(target_path),
+                _properties(FilterName=filters[filetype], Overwrite=True),
+            )
+        finally:
+            document.close(True)
+
+    def kill(self):
+        process = self.process
+        if process is not None and process.poll() is None:
+            logger.warning("Killing office process %s", process.pid)
+            process.kill()
+
+    def stop(self):
+        """Stop the office, the profile is kept"""
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                logger.debug("Cannot terminate the office", exc_info=True)
+            self.desktop = None
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+    def close(self):
+        self.stop()
+        shutil.rmtree(self.user_installation, ignore_errors=True)
+
+
+class Py3oConversionPool(object):
+    """Bounded set of LibreOffice workers shared by the whole process.
+
+    At most ``size`` conversions run at the same time, the other ones wait
+    for a free worker. Conversions are run in background threads so that
+    several documents can be converted concurrently.
+    """
+
+    def __init__(self, size=None, timeout=None, max_jobs=None, use_office=True):
+        self.size = max(int(size or os.cpu_count() or 1), 1)
+        self.timeout = int(timeout or DEFAULT_CONVERSION_TIMEOUT)
+        self.max_jobs = int(
+            DEFAULT_WORKER_MAX_JOBS if max_jobs is None else max_jobs
+        )
+        self.use_office = use_office
+        self._workers = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._all_workers = set()
+        self._executor = None
+
+    def _new_worker(self):
+        worker = Py3oConversionWorker(self.max_jobs)
+        self._all_workers.add(worker)
+        return worker
+
+    def _acquire(self):
+        try:
+            return self._workers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return self._new_worker()
+        try:
+            return self._workers.get(timeout=self.timeout)
+        except queue.Empty as e:
+            raise RuntimeError(
+                "No LibreOffice conversion worker available after %s seconds"
+                % self.timeout
+            ) from e
+
+    def _release(self, worker, recycle=False):
+        worker.jobs += 1
+        if recycle or worker.is_exhausted:
+            logger.debug(
+                "Recycling py3o conversion worker %s after %d job(s)",
+                worker.user_installation,
+                worker.jobs,
+            )
+            with self._lock:
+                self._all_workers.discard(worker)
+                worker.close()
+                worker = self._new_worker()
+        self._workers.put(worker)
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.size, thread_name_prefix="py3o.convert"
+                    )
+        return self._executor
+
+    def can_convert(self, filetype):
+        """Return whether documents can be converted to filetype by the
+        office workers, otherwise the conversion must be run as a command.
+        """
+        return self.use_office and uno is not None and any(
+            filetype in filters for filters in EXPORT_FILTERS.values()
+        )
+
+    def _run_conversion(self, worker, lo_bin, source_path, target_path, filetype):
+        recycle = True
+        # a stuck office is killed, which makes the UNO call fail
+        watchdog = threading.Timer(self.timeout, worker.kill)
+        watchdog.start()
+        try:
+            if not worker.is_running or worker.lo_bin != lo_bin:
+                worker.start(lo_bin, self.timeout)
+            worker.convert(source_path, target_path, filetype)
+            recycle = False
+        finally:
+            watchdog.cancel()
+            self._release(worker, recycle=recycle)
+
+    def submit_conversion(self, lo_bin, source_path, target_path, filetype):
+        """Convert the document at source_path to filetype into target_path
+        with an office worker, started with lo_bin when needed.
+
+        The calling thread blocks while all the workers are busy. The
+        office is killed, and started again by the next conversion, after
+        ``timeout`` seconds.
+
+        :returns: a future resolving when the document is converted
+        """
+        worker = self._acquire()
+        return self._get_executor().submit(
+            self._run_conversion, worker, lo_bin, source_path, target_path, filetype
+        )
+
+    def _run_command(self, worker, command, cwd):
+        recycle = True
+        try:
+            # the profile can't be shared with a running office
+            worker.stop()
+            logger.debug("Running command %s", command)
+            output = subprocess.check_output(command, cwd=cwd, timeout=self.timeout)
+            recycle = False
+            return output
+        finally:
+            self._release(worker, recycle=recycle)
+
+    def submit(self, command_factory, cwd=None):
+        """Start the conversion command returned by ``command_factory``.
+
+        The worker is reserved and the command is built in the calling
+        thread, which blocks while all the workers are busy. Only the
+        command runs in a background thread, so ``command_factory`` can
+        safely use the ORM. The command is killed after ``timeout`` seconds.
+
+        :returns: a future resolving to the output of the command
+        """
+        worker = self._acquire()
+        try:
+            command = command_factory(worker.user_installation)
+        except Exception:
+            self._release(worker)
+            raise
+        return self._get_executor().submit(self._run_command, worker, command, cwd)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        with self._lock:
+            for worker in self._all_workers:
+                worker.close()
+            self._all_workers.clear()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_conversion_pool():
+    """Return the process wide conversion pool, configured from odoo.cfg"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                use_office = tools.config.get_misc(
+                    "report_py3o", "conversion_office_workers", "1"
+                )
+                _pool = Py3oConversionPool(
+                    size=tools.config.get_misc("report_py3o", "conversion_workers"),
+                    timeout=tools.config.get_misc(
+                        "report_py3o", "conversion_timeout"
+                    ),
+                    max_jobs=tools.config.get_misc(
+                        "report_py3o", "conversion_worker_max_jobs"
+                    ),
+                    use_office=tools.str2bool(use_office),
+                )
+                atexit.register(_pool.close)
+    return _pool
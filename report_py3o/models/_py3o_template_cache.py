@@ -0,0 +1,144 @@
+# Copyright 2026 ACSONE SA/NV
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl)
+import copy
+import logging
+import threading
+import warnings
+import zipfile
+from collections import OrderedDict
+from io import BytesIO
+
+from lxml import etree
+
+from odoo import tools
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE_CACHE_SIZE = 64  # MB
+
+try:
+    # workaround for https://github.com/edgewall/genshi/issues/15
+    # that makes runbot build red because of the DeprecationWarning
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=DeprecationWarning)
+        from genshi.template import MarkupTemplate
+        from py3o.template import Template
+except ImportError:
+    logger.debug("Cannot import py3o.template")
+    Template = object
+
+MANIFEST_FILENAME = "META-INF/manifest.xml"
+
+
+class Py3oCompiledTemplate(Template):
+    """A py3o template compiled once and rendered many times.
+
+    Loading the template transforms its XML documents into Genshi templates
+    and compiles them. Each rendering only generates the compiled Genshi
+    templates with its data, on a copy of the template collecting its own
+    images.
+    """
+
+    def __init__(self, template_data, ignore_undefined_variables=False):
+        super().__init__(
+            BytesIO(template_data),
+            None,
+            ignore_undefined_variables=ignore_undefined_variables,
+            escape_false=True,
+        )
+        self.template_data = template_data
+        self.size = len(template_data) + sum(
+            info.file_size
+            for info in self.infile.infolist()
+            if info.filename in self.templated_files
+        )
+        # the py3o transformation is done in place on the parsed documents
+        super().render_tree({})
+        self.output_streams = []
+        self.genshi_templates = [
+            MarkupTemplate(
+                etree.tostring(tree.getroot()),
+                lookup="lenient" if ignore_undefined_variables else "strict",
+            )
+            for tree in self.content_trees
+        ]
+        for genshi_template in self.genshi_templates:
+            # prepared on first use otherwise, not thread safe
+            genshi_template.stream  # pylint: disable=pointless-statement
+
+    def render_tree(self, data):
+        """Generate the compiled Genshi templates with data"""
+        template_dict = dict(data)
+        template_dict.update(self.add_base_data_to_template())
+        for filename, genshi_template in zip(
+            self.templated_files, self.genshi_templates
+        ):
+            self.output_streams.append(
+                (filename, genshi_template.generate(**template_dict))
+            )
+
+    def render_to(self, out_stream, data):
+        """Render the template with data into out_stream"""
+        renderer = copy.copy(self)
+        renderer.outputfilename = out_stream
+        renderer.infile = zipfile.ZipFile(BytesIO(self.template_data), "r")
+        # the images of the rendering are added to the manifest in place
+        renderer.content_trees = [
+            copy.deepcopy(tree) if filename == MANIFEST_FILENAME else tree
+            for filename, tree in zip(self.templated_files, self.content_trees)
+        ]
+        renderer.images = {}
+        renderer.output_streams = []
+        renderer.render(data)
+
+
+class Py3oTemplateCache(object):
+    """LRU cache of compiled py3o templates bounded by an approximate size"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+            return template
+
+    def put(self, key, template):
+        if template.size > self.max_size:
+            return
+        with self._lock:
+            previous = self._templates.pop(key, None)
+            if previous is not None:
+                self.size -= previous.size
+            self._templates[key] = template
+            self.size += template.size
+            while self.size > self.max_size:
+                _key, evicted = self._templates.popitem(last=False)
+                self.size -= evicted.size
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self.size = 0
+
+
+_template_cache = None
+_template_cache_lock = threading.Lock()
+
+
+def get_template_cache():
+    """Return the process wide template cache, configured from odoo.cfg"""
+    global _template_cache
+    if _template_cache is None:
+        with _template_cache_lock:
+            if _template_cache is None:
+                size = tools.config.get_misc(
+                    "report_py3o", "template_cache_size", DEFAULT_TEMPLATE_CACHE_SIZE
+                )
+                _template_cache = Py3oTemplateCache(int(size) * 1024 * 1024)
+    return _template_cache
@@ -75,6 +75,12 @@ class IrActionsReport(models.Model):
         "files as selected records. If you enable this option, Odoo will "
         "generate instead a single report for the selected records.",
     )
+    py3o_conversion_cache = fields.Boolean(
+        string="Cache Conversions",
+        help="If you enable this option, the converted documents are kept in "
+        "a cache and a document identical to an already converted one is not "
+        "converted again by LibreOffice.",
+    )
     lo_bin_path = fields.Char(
         string="Path to the libreoffice runtime", compute="_compute_lo_bin_path"
     )
@@ -158,18 +164,26 @@ class IrActionsReport(models.Model):
         )
 
     @api.model
-    def _render_py3o(self, report_ref, res_ids, data=None):
+    def _get_py3o_report(self, report_ref):
         report = self._get_report(report_ref)
         if report.report_type != "py3o":
             raise RuntimeError(
                 "py3o rendition is only available on py3o report.\n"
                 "(current: '{}', expected 'py3o'".format(report.report_type)
             )
-        return (
-            self.env["py3o.report"]
-            .create({"ir_actions_report_id": report.id})
-            .create_report(res_ids, data)
-        )
+        return self.env["py3o.report"].create({"ir_actions_report_id": report.id})
+
+    @api.model
+    def _render_py3o(self, report_ref, res_ids, data=None):
+        return self._get_py3o_report(report_ref).create_report(res_ids, data)
+
+    @api.model
+    def _render_py3o_file(self, report_ref, res_ids, data=None):
+        """Same as _render_py3o but return the path of a temporary file
+        containing the report instead of its content. The caller is in charge
+        of removing the file.
+        """
+        return self._get_py3o_report(report_ref).create_report_file(res_ids, data)
 
     def gen_report_download_filename(self, res_ids, data):
         """Override this function to change the name of the downloaded report"""
@@ -2,15 +2,14 @@
 # Copyright 2016 ACSONE SA/NV
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl)
 import base64
+import hashlib
 import logging
 import os
-import subprocess
 import sys
 import tempfile
-import warnings
 from base64 import b64decode
+from concurrent.futures import Future, wait
 from contextlib import closing
-from io import BytesIO
 from zipfile import ZIP_DEFLATED, ZipFile
 
 import pkg_resources
@@ -19,20 +18,15 @@ from odoo import _, api, fields, models, tools
 from odoo.exceptions import AccessError
 from odoo.tools.safe_eval import safe_eval, time
 
+from ._py3o_conversion_cache import get_conversion_cache
+from ._py3o_conversion_pool import get_conversion_pool
 from ._py3o_parser_context import Py3oParserContext
+from ._py3o_template_cache import Py3oCompiledTemplate, get_template_cache
 
 logger = logging.getLogger(__name__)
 
 try:
-    # workaround for https://github.com/edgewall/genshi/issues/15
-    # that makes runbot build red because of the DeprecationWarning
-    with warnings.catch_warnings():
-        warnings.filterwarnings("ignore", category=DeprecationWarning)
-        from py3o.template import Template
     from py3o import formats
-except ImportError:
-    logger.debug("Cannot import py3o.template")
-try:
     from py3o.formats import Formats, UnkownFormatException
 except ImportError:
     logger.debug("Cannot import py3o.formats")
@@ -124,9 +118,9 @@ class Py3oReport(models.TransientModel):
         logger.warning("%s is not a valid Py3o template filename", filename)
         return False
 
-    def _get_template_from_path(self, tmpl_name):
-        """Return the template from the path to root of the module if specied
-        or an absolute path on your server
+    def _get_template_filename(self, tmpl_name):
+        """Return the filename of the template from the path to root of the
+        module if specied or an absolute path on your server
         """
         if not tmpl_name:
             return None
@@ -140,6 +134,15 @@ class Py3oReport(models.TransientModel):
         elif self._is_valid_template_path(tmpl_name):
             flbk_filename = os.path.realpath(tmpl_name)
         if self._is_valid_template_filename(flbk_filename):
+            return flbk_filename
+        return None
+
+    def _get_template_from_path(self, tmpl_name):
+        """Return the template from the path to root of the module if specied
+        or an absolute path on your server
+        """
+        flbk_filename = self._get_template_filename(tmpl_name)
+        if flbk_filename:
             with open(flbk_filename, "rb") as tmpl:
                 return tmpl.read()
         return None
@@ -181,6 +184,25 @@ class Py3oReport(models.TransientModel):
 
         return tmpl_data
 
+    def _get_template_cache_key(self, tmpl_data):
+        """Return the key of the compiled version of tmpl_data, the template
+        returned by get_template for the record being rendered.
+        """
+        return hashlib.sha1(tmpl_data).hexdigest()
+
+    def _get_compiled_template(self, model_instance):
+        """Return the template of model_instance, compiled once per template
+        content
+        """
+        tmpl_data = self.get_template(model_instance)
+        key = self._get_template_cache_key(tmpl_data)
+        cache = get_template_cache()
+        template = cache.get(key)
+        if template is None:
+            template = Py3oCompiledTemplate(tmpl_data)
+            cache.put(key, template)
+        return template
+
     def _extend_parser_context(self, context, report_xml):
         # add default extenders
         for fct in _extender_functions.get(None, []):
@@ -203,52 +225,50 @@ class Py3oReport(models.TransientModel):
 
     def _postprocess_report(self, model_instance, result_path):
         if len(model_instance) == 1 and self.ir_actions_report_id.attachment:
-            with open(result_path, "rb") as f:
-                # we do all the generation process using files to avoid memory
-                # consumption...
-                # ... but odoo wants the whole data in memory anyways :)
-                buffer = BytesIO(f.read())
-                attachment_name = safe_eval(
-                    self.ir_actions_report_id.attachment,
-                    {"object": model_instance, "time": time},
-                )
-                if attachment_name:
+            attachment_name = safe_eval(
+                self.ir_actions_report_id.attachment,
+                {"object": model_instance, "time": time},
+            )
+            if attachment_name:
+                with open(result_path, "rb") as f:
                     attachment_vals = {
                         "name": attachment_name,
                         "res_model": self.ir_actions_report_id.model,
                         "res_id": model_instance.id,
-                        "raw": buffer.getvalue(),
+                        "raw": f.read(),
                     }
-                    try:
-                        attach = self.env["ir.attachment"].create(attachment_vals)
-                    except AccessError:
-                        logger.info(
-                            "Cannot save PDF report %s as attachment",
-                            attachment_vals["name"],
-                        )
-                    else:
-                        logger.info(
-                            "PDF document %s saved as attachment ID %d",
-                            attachment_vals["name"],
-                            attach.id,
-                        )
+                try:
+                    attach = self.env["ir.attachment"].create(attachment_vals)
+                except AccessError:
+                    logger.info(
+                        "Cannot save PDF report %s as attachment",
+                        attachment_vals["name"],
+                    )
+                else:
+                    logger.info(
+                        "PDF document %s saved as attachment ID %d",
+                        attachment_vals["name"],
+                        attach.id,
+                    )
         return result_path
 
-    def _create_single_report(self, model_instance, data):
-        """This function to generate our py3o report"""
+    def _render_single_report(self, model_instance, data):
+        """Render the template and return the path of the ODF document"""
         self.ensure_one()
         result_fd, result_path = tempfile.mkstemp(
             suffix=".ods", prefix="p3o.report.tmp."
         )
-        tmpl_data = self.get_template(model_instance)
+        template = self._get_compiled_template(model_instance)
 
-        in_stream = BytesIO(tmpl_data)
         with closing(os.fdopen(result_fd, "wb+")) as out_stream:
-            template = Template(in_stream, out_stream, escape_false=True)
             localcontext = self._get_parser_context(model_instance, data)
-            template.render(localcontext)
-            out_stream.seek(0)
-            tmpl_data = out_stream.read()
+            template.render_to(out_stream, localcontext)
+        return result_path
+
+    def _create_single_report(self, model_instance, data):
+        """This function to generate our py3o report"""
+        self.ensure_one()
+        result_path = self._render_single_report(model_instance, data)
 
         if self.env.context.get("report_py3o_skip_conversion"):
             return result_path
@@ -260,34 +280,72 @@ class Py3oReport(models.TransientModel):
     def _convert_single_report(self, result_path, model_instance, data):
         """Run a command to convert to our target format"""
         if not self.ir_actions_report_id.is_py3o_native_format:
-            with tempfile.TemporaryDirectory() as tmp_user_installation:
-                command = self._convert_single_report_cmd(
+            future = self._submit_conversion(result_path, model_instance, data)
+            result_path = self._get_conversion_result(result_path, future)
+        return result_path
+
+    def _submit_conversion(self, result_path, model_instance, data):
+        """Start the conversion of the rendered document in the conversion
+        pool and return a future resolving to the output of the command.
+        """
+        report_xml = self.ir_actions_report_id
+        if report_xml.py3o_conversion_cache:
+            cache = get_conversion_cache(self.env.cr.dbname)
+            cache_key = cache.get_key(
+                result_path, report_xml.py3o_filetype, report_xml.lo_bin_path
+            )
+            converted_path = self._get_converted_report_path(result_path)
+            if cache.fetch(cache_key, converted_path):
+                future = Future()
+                future.set_result(b"")
+                return future
+        pool = get_conversion_pool()
+        if pool.can_convert(report_xml.py3o_filetype):
+            # converted by an office kept running between conversions
+            future = pool.submit_conversion(
+                self._get_lo_bin_path(),
+                result_path,
+                self._get_converted_report_path(result_path),
+                report_xml.py3o_filetype,
+            )
+        else:
+            future = pool.submit(
+                lambda user_installation: self._convert_single_report_cmd(
                     result_path,
                     model_instance,
                     data,
-                    user_installation=tmp_user_installation,
-                )
-                logger.debug("Running command %s", command)
-                output = subprocess.check_output(
-                    command, cwd=os.path.dirname(result_path)
-                )
-                logger.debug("Output was %s", output)
-                self._cleanup_tempfiles([result_path])
-                result_path, result_filename = os.path.split(result_path)
-                result_path = os.path.join(
-                    result_path,
-                    "%s.%s"
-                    % (
-                        os.path.splitext(result_filename)[0],
-                        self.ir_actions_report_id.py3o_filetype,
-                    ),
-                )
-        return result_path
+                    user_installation=user_installation,
+                ),
+                cwd=os.path.dirname(result_path),
+            )
+        if report_xml.py3o_conversion_cache:
+            future = cache.store_on_success(future, cache_key, converted_path)
+        return future
 
-    def _convert_single_report_cmd(
-        self, result_path, model_instance, data, user_installation=None
-    ):
-        """Return a command list suitable for use in subprocess.call"""
+    def _get_conversion_result(self, result_path, future):
+        """Wait for the conversion of result_path and return the path of the
+        converted document.
+        """
+        try:
+            output = future.result()
+            logger.debug("Output was %s", output)
+        finally:
+            self._cleanup_tempfiles([result_path])
+        return self._get_converted_report_path(result_path)
+
+    def _get_converted_report_path(self, result_path):
+        """Return the path where the conversion command writes its result"""
+        result_path, result_filename = os.path.split(result_path)
+        return os.path.join(
+            result_path,
+            "%s.%s"
+            % (
+                os.path.splitext(result_filename)[0],
+                self.ir_actions_report_id.py3o_filetype,
+            ),
+        )
+
+    def _get_lo_bin_path(self):
         lo_bin = self.ir_actions_report_id.lo_bin_path
         if not lo_bin:
             raise RuntimeError(
@@ -296,6 +354,13 @@ class Py3oReport(models.TransientModel):
                     "Please contact your administrator."
                 )
             )
+        return lo_bin
+
+    def _convert_single_report_cmd(
+        self, result_path, model_instance, data, user_installation=None
+    ):
+        """Return a command list suitable for use in subprocess.call"""
+        lo_bin = self._get_lo_bin_path()
         cmd = [
             lo_bin,
             "--headless",
@@ -307,9 +372,10 @@ class Py3oReport(models.TransientModel):
             cmd.append("-env:UserInstallation=file:%s" % user_installation)
         return cmd
 
-    def _get_or_create_single_report(
-        self, model_instance, data, existing_reports_attachment
+    def _get_single_report_from_attachment(
+        self, model_instance, existing_reports_attachment
     ):
+        """Return the path of a copy of the saved report if it can be reused"""
         self.ensure_one()
         attachment = existing_reports_attachment.get(model_instance.id)
         if attachment and self.ir_actions_report_id.attachment_use:
@@ -321,8 +387,74 @@ class Py3oReport(models.TransientModel):
             with open(report_file, "wb") as f:
                 f.write(content)
             return report_file
+        return None
+
+    def _get_or_create_single_report(
+        self, model_instance, data, existing_reports_attachment
+    ):
+        self.ensure_one()
+        report_file = self._get_single_report_from_attachment(
+            model_instance, existing_reports_attachment
+        )
+        if report_file:
+            return report_file
         return self._create_single_report(model_instance, data)
 
+    def _get_or_create_reports(self, model_instances, data):
+        """Generate one report per record.
+
+        The records are rendered one after the other in the current thread
+        since rendering uses the ORM, while the conversions of the rendered
+        documents run concurrently in the conversion pool. The paths are
+        returned in the order of model_instances.
+        """
+        self.ensure_one()
+        existing_reports_attachment = self.ir_actions_report_id._get_attachments(
+            model_instances.ids
+        )
+        if (
+            len(model_instances) < 2
+            or self.ir_actions_report_id.is_py3o_native_format
+            or self.env.context.get("report_py3o_skip_conversion")
+        ):
+            return [
+                self._get_or_create_single_report(
+                    model_instance, data, existing_reports_attachment
+                )
+                for model_instance in model_instances
+            ]
+        pending = []
+        reports_path = []
+        try:
+            for model_instance in model_instances:
+                report_file = self._get_single_report_from_attachment(
+                    model_instance, existing_reports_attachment
+                )
+                if report_file:
+                    pending.append((model_instance, report_file, None))
+                    continue
+                result_path = self._render_single_report(model_instance, data)
+                future = self._submit_conversion(result_path, model_instance, data)
+                pending.append((model_instance, result_path, future))
+            while pending:
+                model_instance, result_path, future = pending.pop(0)
+                if future is not None:
+                    result_path = self._get_conversion_result(result_path, future)
+                    result_path = self._postprocess_report(model_instance, result_path)
+                reports_path.append(result_path)
+        except Exception:
+            # wait for the running conversions before removing their files
+            for _model_instance, result_path, future in pending:
+                reports_path.append(result_path)
+                if future is not None:
+                    wait([future])
+                    reports_path.append(self._get_converted_report_path(result_path))
+            self._cleanup_tempfiles(
+                [path for path in reports_path if os.path.exists(path)]
+            )
+            raise
+        return reports_path
+
     def _zip_results(self, reports_path):
         self.ensure_one()
         zfname_prefix = self.ir_actions_report_id.name
@@ -378,32 +510,34 @@ class Py3oReport(models.TransientModel):
             except OSError:
                 logger.error("Error when trying to remove file %s" % temporary_file)
 
-    def create_report(self, res_ids, data):
-        """Override this function to handle our py3o report"""
+    def create_report_file(self, res_ids, data):
+        """Generate the report into a temporary file.
+
+        :returns: a tuple (path of the report file, filetype). The caller is
+            in charge of removing the file.
+        """
         model_instances = self.env[self.ir_actions_report_id.model].browse(res_ids)
         reports_path = []
         if len(res_ids) > 1 and self.ir_actions_report_id.py3o_multi_in_one:
             reports_path.append(self._create_single_report(model_instances, data))
         else:
-            existing_reports_attachment = self.ir_actions_report_id._get_attachments(
-                res_ids
-            )
-            for model_instance in model_instances:
-                reports_path.append(
-                    self._get_or_create_single_report(
-                        model_instance, data, existing_reports_attachment
-                    )
-                )
+            reports_path.extend(self._get_or_create_reports(model_instances, data))
 
         result_path, filetype = self._merge_results(reports_path)
-        reports_path.append(result_path)
+        self._cleanup_tempfiles(set(reports_path) - {result_path})
+        return result_path, filetype
+
+    def create_report(self, res_ids, data):
+        """Override this function to handle our py3o report"""
+        result_path, filetype = self.create_report_file(res_ids, data)
 
         # Here is a little joke about Odoo
         # we do all the generation process using files to avoid memory
         # consumption...
         # ... but odoo wants the whole data in memory anyways :)
+        # (use create_report_file to stream the result instead)
 
         with open(result_path, "r+b") as fd:
             res = fd.read()
-        self._cleanup_tempfiles(set(reports_path))
+        self._cleanup_tempfiles([result_path])
         return res, filetype
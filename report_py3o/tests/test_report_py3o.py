@@ -5,10 +5,13 @@ import base64
 import logging
 import os
 import shutil
+import subprocess
 import tempfile
 from base64 import b64decode, b64encode
 from contextlib import contextmanager
+from io import BytesIO
 from unittest import mock
+from zipfile import ZipFile, ZipInfo
 
 import pkg_resources
 try:
@@ -31,6 +34,11 @@ from odoo.tests.common import TransactionCase
 
 from odoo.addons.base.tests.test_mimetypes import PNG
 
+from ..models._py3o_conversion_cache import Py3oConversionCache
+from ..models._py3o_conversion_pool import (
+    Py3oConversionPool,
+    Py3oConversionWorker,
+)
 from ..models._py3o_parser_context import format_multiline_value
 from ..models.ir_actions_report import PY3O_CONVERSION_COMMAND_PARAMETER
 from ..models.py3o_report import TemplateNotFound
@@ -282,3 +290,197 @@ class TestReportPy3o(TransactionCase):
         self.assertFalse(self.report.msg_py3o_report_not_available)
         res = self.report._render(self.report.id, self.env.user.ids)
         self.assertTrue(res)
+
+    def test_conversion_pool_reuse_and_recycle(self):
+        pool = Py3oConversionPool(size=1, timeout=1, max_jobs=2)
+        profiles = []
+
+        def command_factory(command):
+            def factory(user_installation):
+                self.assertTrue(os.path.isdir(user_installation))
+                profiles.append(user_installation)
+                return command
+
+            return factory
+
+        try:
+            pool.submit(command_factory(["true"])).result()
+            pool.submit(command_factory(["true"])).result()
+            self.assertEqual(profiles[0], profiles[1])
+            # the profile is recreated once it was used by max_jobs conversions
+            self.assertFalse(os.path.exists(profiles[0]))
+            worker = pool._acquire()
+            try:
+                # the only profile is in use, the next conversion times out
+                with self.assertRaises(RuntimeError):
+                    pool.submit(command_factory(["true"]))
+            finally:
+                pool._release(worker)
+            # a failing conversion recycles the profile
+            with self.assertRaises(subprocess.CalledProcessError):
+                pool.submit(command_factory(["false"])).result()
+            self.assertFalse(os.path.exists(profiles[-1]))
+        finally:
+            pool.close()
+
+    def test_conversion_pool_submit(self):
+        pool = Py3oConversionPool(size=2, timeout=5)
+        try:
+            futures = [
+                pool.submit(lambda user_installation, i=i: ["echo", str(i)])
+                for i in range(5)
+            ]
+            self.assertEqual(
+                [b"0\n", b"1\n", b"2\n", b"3\n", b"4\n"],
+                [future.result() for future in futures],
+            )
+        finally:
+            pool.close()
+
+    def test_conversion_pool_office_workers(self):
+        pool = Py3oConversionPool(size=1, timeout=5, max_jobs=0)
+        tmp_dir = tempfile.mkdtemp()
+        started = []
+
+        def start(worker, lo_bin, timeout):
+            started.append(worker)
+            worker.lo_bin = lo_bin
+            worker.process = subprocess.Popen(["sleep", "60"])
+            worker.desktop = mock.Mock()
+            worker.desktop.terminate.side_effect = worker.process.terminate
+
+        def convert(worker, source_path, target_path, filetype):
+            if filetype == "crash":
+                worker.kill()
+                raise RuntimeError("office crashed")
+            with open(target_path, "w") as f:
+                f.write(filetype)
+
+        def submit(filetype):
+            target_path = os.path.join(tmp_dir, "%d.%s" % (len(started), filetype))
+            pool.submit_conversion(
+                "soffice", "source.odt", target_path, filetype
+            ).result()
+            return target_path
+
+        try:
+            with mock.patch.object(
+                Py3oConversionWorker, "start", start
+            ), mock.patch.object(Py3oConversionWorker, "convert", convert):
+                self.assertTrue(os.path.exists(submit("pdf")))
+                self.assertTrue(os.path.exists(submit("pdf")))
+                # the office is started once for both conversions
+                self.assertEqual(len(started), 1)
+                # an office that died is started again
+                started[0].kill()
+                started[0].process.wait()
+                submit("pdf")
+                self.assertEqual(len(started), 2)
+                self.assertIs(started[0], started[1])
+                # a failing conversion replaces the worker
+                with self.assertRaises(RuntimeError):
+                    submit("crash")
+                self.assertFalse(started[1].is_running)
+                self.assertFalse(os.path.exists(started[1].user_installation))
+                submit("pdf")
+                self.assertEqual(len(started), 3)
+                self.assertIsNot(started[1], started[2])
+        finally:
+            pool.close()
+            shutil.rmtree(tmp_dir)
+        self.assertFalse(started[2].is_running)
+
+    def test_compiled_template_cache(self):
+        template = self.py3o_report._get_compiled_template(self.env.user)
+        self.assertIs(
+            template, self.py3o_report._get_compiled_template(self.env.user)
+        )
+        res = self.report._render(self.report.id, self.env.user.ids)
+        self.assertTrue(res)
+        # the template is chosen per record by _get_template_fallback, each
+        # record gets the template compiled from its own template
+        tmpl_data = self.py3o_report.get_template(self.env.user)
+        other_tmpl = BytesIO()
+        with ZipFile(BytesIO(tmpl_data)) as src, ZipFile(other_tmpl, "w") as dst:
+            for info in src.infolist():
+                dst.writestr(info, src.read(info))
+            dst.comment = b"other template"
+        other_user = self.env["res.users"].create(
+            {"name": "Other template user", "login": "py3o_other_template"}
+        )
+        py3o_report_class = type(self.py3o_report)
+        with mock.patch.object(
+            py3o_report_class,
+            "_get_template_fallback",
+            lambda report, record: (
+                other_tmpl.getvalue() if record == other_user else tmpl_data
+            ),
+        ):
+            other_template = self.py3o_report._get_compiled_template(other_user)
+            self.assertIsNot(template, other_template)
+            self.assertIs(
+                template, self.py3o_report._get_compiled_template(self.env.user)
+            )
+            self.assertEqual(
+                other_template.template_data, other_tmpl.getvalue()
+            )
+
+    def test_compiled_template_images(self):
+        # the demo template inserts the image of the user, each rendering
+        # of the cached template must list its own image in the manifest
+        self.py3o_report._get_compiled_template(self.env.user)
+        for _i in range(2):
+            result_path = self.py3o_report._render_single_report(self.env.user, {})
+            try:
+                with ZipFile(result_path) as document:
+                    manifest = document.read("META-INF/manifest.xml").decode()
+                    pictures = [
+                        name
+                        for name in document.namelist()
+                        if name.startswith("Pictures/")
+                    ]
+            finally:
+                os.unlink(result_path)
+            self.assertEqual(len(pictures), 1)
+            self.assertEqual(manifest.count("Pictures/"), 1)
+            self.assertIn(pictures[0], manifest)
+
+    def test_render_py3o_file(self):
+        self.report.py3o_filetype = "odt"
+        users = self.env["res.users"].search([], limit=2)
+        result_path, filetype = self.report._render_py3o_file(
+            self.report.id, users.ids
+        )
+        try:
+            self.assertEqual(filetype, "zip")
+            self.assertTrue(os.path.getsize(result_path))
+        finally:
+            os.unlink(result_path)
+
+    def test_conversion_cache(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            documents = []
+            for date_time in [(2020, 1, 1, 0, 0, 0), (2021, 1, 1, 0, 0, 0)]:
+                path = os.path.join(tmp_dir, "%s.odt" % date_time[0])
+                with ZipFile(path, "w") as zf:
+                    zf.writestr(ZipInfo("content.xml", date_time), "content")
+                documents.append(path)
+            # the timestamps of the archive are not part of the key
+            key = Py3oConversionCache.get_key(documents[0], "pdf")
+            self.assertEqual(key, Py3oConversionCache.get_key(documents[1], "pdf"))
+            self.assertNotEqual(key, Py3oConversionCache.get_key(documents[0], "doc"))
+
+            cache = Py3oConversionCache(os.path.join(tmp_dir, "cache"), 10)
+            target = os.path.join(tmp_dir, "result.pdf")
+            self.assertFalse(cache.fetch(key, target))
+            cache.store(key, documents[0])
+            # the cache is bigger than its max size, the entry is evicted
+            self.assertFalse(cache.fetch(key, target))
+            cache.max_size = 1024 * 1024
+            cache.store(key, documents[0])
+            self.assertTrue(cache.fetch(key, target))
+            with open(target, "rb") as f1, open(documents[0], "rb") as f2:
+                self.assertEqual(f1.read(), f2.read())
+        finally:
+            shutil.rmtree(tmp_dir)
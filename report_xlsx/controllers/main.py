@@ -4,12 +4,14 @@
 
 import json
 import logging
+import os
 
 import werkzeug.exceptions
 from werkzeug.urls import url_parse
+from werkzeug.wsgi import wrap_file
 
 from odoo import http
-from odoo.http import content_disposition, request
+from odoo.http import Response, content_disposition, request
 from odoo.tools.misc import html_escape
 from odoo.tools.safe_eval import safe_eval, time
 
@@ -31,9 +33,12 @@ class ReportXlsxController(ReportController):
             if data.get("context"):
                 data["context"] = json.loads(data["context"])
                 context.update(data["context"])
-            xlsx = report.with_context(**context)._render_xlsx(
-                reportname, docids, data=data
-            )[0]
+            report = report.with_context(**context)
+            if report._get_xlsx_report_model(reportname)._xlsx_constant_memory:
+                return self._make_xlsx_file_response(
+                    report._render_xlsx_file(reportname, docids, data=data)[0]
+                )
+            xlsx = report._render_xlsx(reportname, docids, data=data)[0]
             xlsxhttpheaders = [
                 (
                     "Content-Type",
@@ -45,6 +50,25 @@ class ReportXlsxController(ReportController):
             return request.make_response(xlsx, headers=xlsxhttpheaders)
         return super().report_routes(reportname, docids, converter, **data)
 
+    def _make_xlsx_file_response(self, file_path):
+        """Stream the report file from disk"""
+        # the file is removed from the disk right away but stays readable
+        # until the response is sent and closes it
+        xlsx_file = open(file_path, "rb")
+        os.unlink(file_path)
+        xlsxhttpheaders = [
+            (
+                "Content-Type",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            ),
+            ("Content-Length", os.fstat(xlsx_file.fileno()).st_size),
+        ]
+        return Response(
+            wrap_file(request.httprequest.environ, xlsx_file),
+            headers=xlsxhttpheaders,
+            direct_passthrough=True,
+        )
+
     @http.route()
     def report_download(self, data, context=None, token=None, readonly=True):
         requestcontent = json.loads(data)
@@ -12,13 +12,25 @@ class ReportAction(models.Model):
     )
 
     @api.model
-    def _render_xlsx(self, report_ref, docids, data):
+    def _get_xlsx_report_model(self, report_ref):
         report_sudo = self._get_report(report_ref)
         report_model_name = "report.%s" % report_sudo.report_name
         report_model = self.env[report_model_name]
-        return (
-            report_model.with_context(active_model=report_sudo.model)
-            .create_xlsx_report(docids, data)
+        return report_model.with_context(active_model=report_sudo.model)
+
+    @api.model
+    def _render_xlsx(self, report_ref, docids, data):
+        return self._get_xlsx_report_model(report_ref).create_xlsx_report(
+            docids, data
+        )
+
+    @api.model
+    def _render_xlsx_file(self, report_ref, docids, data):
+        """Same as _render_xlsx but return the path of a temporary file
+        containing the report. The caller is in charge of removing the file.
+        """
+        return self._get_xlsx_report_model(report_ref).create_xlsx_report_file(
+            docids, data
         )
 
     @api.model
@@ -2,7 +2,9 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
 import logging
+import os
 import re
+import tempfile
 from io import BytesIO
 
 from odoo import models
@@ -67,6 +69,13 @@ class ReportXlsxAbstract(models.AbstractModel):
     _name = "report.report_xlsx.abstract"
     _description = "Abstract XLSX Report"
 
+    # Set to True in reports writing large sheets: xlsxwriter then flushes
+    # each row to a temporary file as soon as the next row is started
+    # instead of keeping all the cells in memory. The rows of a sheet must
+    # be written in order (see write_rows) and the report is streamed from
+    # disk by the download controller.
+    _xlsx_constant_memory = False
+
     def _get_objs_for_report(self, docids, data):
         """
         Returns objects for xlx report.  From WebUI these
@@ -97,14 +106,45 @@ class ReportXlsxAbstract(models.AbstractModel):
         return f"{f'{s_before}'}#,##0.{'0' * currency.decimal_places}{f'{s_after}'}"
 
     def create_xlsx_report(self, docids, data):
+        if self._xlsx_constant_memory:
+            file_path, filetype = self.create_xlsx_report_file(docids, data)
+            try:
+                with open(file_path, "rb") as f:
+                    return f.read(), filetype
+            finally:
+                os.unlink(file_path)
         objs = self._get_objs_for_report(docids, data)
         file_data = BytesIO()
-        workbook = xlsxwriter.Workbook(file_data, self.get_workbook_options())
+        workbook = xlsxwriter.Workbook(file_data, self._get_workbook_options())
         self.generate_xlsx_report(workbook, data, objs)
         workbook.close()
         file_data.seek(0)
         return file_data.read(), "xlsx"
 
+    def create_xlsx_report_file(self, docids, data):
+        """Generate the report into a temporary file.
+
+        :return: a tuple (path of the file, filetype). The caller is in
+            charge of removing the file.
+        """
+        objs = self._get_objs_for_report(docids, data)
+        fd, file_path = tempfile.mkstemp(suffix=".xlsx", prefix="report.xlsx.tmp.")
+        os.close(fd)
+        try:
+            workbook = xlsxwriter.Workbook(file_path, self._get_workbook_options())
+            self.generate_xlsx_report(workbook, data, objs)
+            workbook.close()
+        except Exception:
+            os.unlink(file_path)
+            raise
+        return file_path, "xlsx"
+
+    def _get_workbook_options(self):
+        options = dict(self.get_workbook_options())
+        if self._xlsx_constant_memory:
+            options.setdefault("constant_memory", True)
+        return options
+
     def get_workbook_options(self):
         """
         See https://xlsxwriter.readthedocs.io/workbook.html constructor options
@@ -112,5 +152,18 @@ class ReportXlsxAbstract(models.AbstractModel):
         """
         return {}
 
+    def write_rows(self, sheet, rows, first_row=0, first_col=0, cell_format=None):
+        """Write rows of plain values in order, one write_row call per row.
+
+        :param rows: any iterable of rows, e.g. a database cursor, so that
+            the rows don't need to be loaded in memory first.
+        :return: the index of the row following the last written row.
+        """
+        row_num = first_row
+        for row in rows:
+            sheet.write_row(row_num, first_col, row, cell_format)
+            row_num += 1
+        return row_num
+
     def generate_xlsx_report(self, workbook, data, objs):
         raise NotImplementedError()
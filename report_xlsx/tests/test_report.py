@@ -2,6 +2,7 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
 import logging
+from unittest import mock
 
 from odoo.tests import common
 
@@ -34,6 +35,26 @@ class TestReport(common.TransactionCase):
         sheet = wb.sheet_by_index(0)
         self.assertEqual(sheet.cell(0, 0).value, self.docs.name)
 
+    def test_report_constant_memory(self):
+        report_model = self.env["report.report_xlsx.partner_xlsx"]
+        self.patch(type(report_model), "_xlsx_constant_memory", True)
+        self.assertTrue(
+            report_model._get_workbook_options().get("constant_memory")
+        )
+        rep = self.report_object._render(self.report_name, self.docs.ids, {})
+        wb = open_workbook(file_contents=rep[0])
+        sheet = wb.sheet_by_index(0)
+        self.assertEqual(sheet.cell(0, 0).value, self.docs.name)
+
+    def test_write_rows(self):
+        sheet = mock.Mock()
+        next_row = self.xlsx_report.write_rows(sheet, iter([(1, 2), (3, 4)]), 2)
+        self.assertEqual(next_row, 4)
+        self.assertEqual(
+            sheet.write_row.call_args_list,
+            [mock.call(2, 0, (1, 2), None), mock.call(3, 0, (3, 4), None)],
+        )
+
     def test_id_retrieval(self):
         # Typical call from WebUI with wizard
         objs = self.xlsx_report._get_objs_for_report(
@@ -6,34 +6,79 @@ class ReportXlsxAbstract(models.AbstractModel):
     _description = "Abstract XLSX Dynamic Report"
     _inherit = "report.report_xlsx.abstract"
 
-    def write_dynamic_report(self, sheet, data):
+    def get_cell_format(self, workbook, formats, style=None):
+        """Return the format of the workbook for the given style dict.
+
+        formats is a dict kept by the caller for the whole workbook, formats
+        are interned in it so that cells sharing the same style share the
+        same format instead of adding a new one to the workbook.
+        """
+        key = tuple(
+            sorted((name, repr(value)) for name, value in (style or {}).items())
+        )
+        cell_format = formats.get(key)
+        if cell_format is None:
+            cell_format = formats[key] = workbook.add_format(style or {})
+        return cell_format
+
+    def _get_row_segments(self, row):
+        """Split a row into the spans it covers in the sheet.
+
+        Yield (column, values) for each run of contiguous plain values and
+        (column, cell) for each cell dict, the column being shifted by the
+        colspan of the previous cell dicts of the row.
+        """
+        col = 0
+        values = []
+        for cell in row:
+            if isinstance(cell, dict):
+                if values:
+                    yield col, values
+                    col += len(values)
+                    values = []
+                yield col, cell
+                col += cell.get('colspan', 1)
+            else:
+                values.append(cell)
+        if values:
+            yield col, values
+
+    def write_dynamic_report(self, sheet, data, workbook=None, formats=None):
+        """Write rows of plain values and cell dicts into sheet.
+
+        data can be any iterable of rows, e.g. a database cursor, so that
+        the rows are written as they are produced. Runs of plain values are
+        written with a single write_row call. A cell dict may give its
+        cell_format as a style dict, it is then converted with
+        get_cell_format on workbook and formats, workbook is required to
+        write such cells.
+        """
+        if formats is None:
+            formats = {}
         for row_num, row in enumerate(data):
-            col_shift = 0  # Initialize column shift for each row
-            for col_num, cell in enumerate(row):
-                adjusted_col_num = col_num + col_shift
-                if isinstance(cell, dict):
-                    rowspan = cell.get('rowspan', 1)  # Default to 1 to cover the cell itself
-                    colspan = cell.get('colspan', 1)  # Default to 1 to cover the cell itself
-                    if colspan > 1 or rowspan > 1:
-                        sheet.merge_range(
-                            row_num,
-                            adjusted_col_num,
-                            row_num + rowspan - 1,
-                            adjusted_col_num + colspan - 1,
-                            cell['cell_value'],
-                            cell.get('cell_format'),
-                        )
-                    else:
-                        sheet.write(
-                            row_num,
-                            adjusted_col_num,
-                            cell['cell_value'],
-                            cell.get('cell_format'),
+            for col, segment in self._get_row_segments(row):
+                if not isinstance(segment, dict):
+                    sheet.write_row(row_num, col, segment)
+                    continue
+                rowspan = segment.get('rowspan', 1)
+                colspan = segment.get('colspan', 1)
+                cell_format = segment.get('cell_format')
+                if isinstance(cell_format, dict):
+                    if workbook is None:
+                        raise ValueError(
+                            "A workbook is required to write the cell of row %s "
+                            "column %s with a style dict as cell_format."
+                            % (row_num, col)
                         )
-                    col_shift += colspan - 1  # Increase shift by colspan minus 1 (for the current cell)
-                else:
-                    sheet.write(
+                    cell_format = self.get_cell_format(workbook, formats, cell_format)
+                if colspan > 1 or rowspan > 1:
+                    sheet.merge_range(
                         row_num,
-                        adjusted_col_num,
-                        cell,
+                        col,
+                        row_num + rowspan - 1,
+                        col + colspan - 1,
+                        segment['cell_value'],
+                        cell_format,
                     )
+                else:
+                    sheet.write(row_num, col, segment['cell_value'], cell_format)
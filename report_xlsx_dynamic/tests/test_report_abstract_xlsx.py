@@ -0,0 +1,145 @@
+import logging
+import random
+from io import BytesIO
+from unittest import mock
+
+from odoo.tests import common
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import xlsxwriter
+except ImportError:
+    _logger.debug("Can not import xlsxwriter.")
+
+
+def get_written_cells(sheet):
+    """Return the cells written through the sheet mock by position"""
+    cells = {}
+    for name, args, _kwargs in sheet.method_calls:
+        if name == "write_row":
+            row, col, values = args[:3]
+            for index, value in enumerate(values):
+                cells[(row, col + index)] = (value, None)
+        elif name == "write":
+            row, col, value = args[:3]
+            cells[(row, col)] = (value, args[3] if len(args) > 3 else None)
+        elif name == "merge_range":
+            cells[tuple(args[:4])] = tuple(args[4:])
+    return cells
+
+
+def write_cell_by_cell(sheet, data):
+    """Write data one cell at a time like write_dynamic_report used to"""
+    for row_num, row in enumerate(data):
+        col_shift = 0
+        for col_num, cell in enumerate(row):
+            adjusted_col_num = col_num + col_shift
+            if isinstance(cell, dict):
+                rowspan = cell.get("rowspan", 1)
+                colspan = cell.get("colspan", 1)
+                if colspan > 1 or rowspan > 1:
+                    sheet.merge_range(
+                        row_num,
+                        adjusted_col_num,
+                        row_num + rowspan - 1,
+                        adjusted_col_num + colspan - 1,
+                        cell["cell_value"],
+                        cell.get("cell_format"),
+                    )
+                else:
+                    sheet.write(
+                        row_num,
+                        adjusted_col_num,
+                        cell["cell_value"],
+                        cell.get("cell_format"),
+                    )
+                col_shift += colspan - 1
+            else:
+                sheet.write(row_num, adjusted_col_num, cell)
+
+
+class TestReportAbstractXlsx(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = cls.env["report.report_xlsx_dynamic.abstract"]
+
+    def test_get_cell_format(self):
+        workbook = xlsxwriter.Workbook(BytesIO(), {"in_memory": True})
+        formats = {}
+        cell_format = self.report.get_cell_format(
+            workbook, formats, {"bold": True, "border": 1}
+        )
+        self.assertIs(
+            cell_format,
+            self.report.get_cell_format(
+                workbook, formats, {"border": 1, "bold": True}
+            ),
+        )
+        self.assertIsNot(
+            cell_format, self.report.get_cell_format(workbook, formats, {"bold": True})
+        )
+        workbook.close()
+
+    def test_write_dynamic_report_rows(self):
+        bold = mock.sentinel.bold
+        data = [
+            ["Name", {"cell_value": "Total", "colspan": 2, "cell_format": bold}],
+            ["a", 1, 2, {"cell_value": 3, "cell_format": bold}, 4, 5],
+            [{"cell_value": "b", "rowspan": 2}, 6, {"cell_value": 7}, 8],
+            [],
+            [9, 10, 11],
+        ]
+        sheet = mock.Mock()
+        self.report.write_dynamic_report(sheet, iter(data))
+        expected_sheet = mock.Mock()
+        write_cell_by_cell(expected_sheet, data)
+        self.assertEqual(
+            get_written_cells(sheet), get_written_cells(expected_sheet)
+        )
+        self.assertEqual(
+            [call[0] for call in sheet.method_calls].count("write_row"), 6
+        )
+
+    def test_write_dynamic_report_style_without_workbook(self):
+        data = [["a", {"cell_value": 1, "cell_format": {"bold": True}}]]
+        with self.assertRaisesRegex(ValueError, "workbook is required"):
+            self.report.write_dynamic_report(mock.Mock(), data)
+        workbook = mock.Mock()
+        sheet = mock.Mock()
+        self.report.write_dynamic_report(sheet, data, workbook=workbook)
+        workbook.add_format.assert_called_once_with({"bold": True})
+        sheet.write.assert_called_once_with(
+            0, 1, 1, workbook.add_format.return_value
+        )
+
+    def test_write_dynamic_report_random_rows(self):
+        rng = random.Random(18)
+        formats = [None, mock.sentinel.bold, mock.sentinel.italic]
+
+        def random_cell():
+            if rng.random() < 0.6:
+                return rng.choice([rng.randint(-100, 100), "text", 1.5, None])
+            cell = {"cell_value": rng.randint(0, 100)}
+            if rng.random() < 0.5:
+                cell["cell_format"] = rng.choice(formats)
+            if rng.random() < 0.4:
+                cell["colspan"] = rng.randint(1, 4)
+            if rng.random() < 0.2:
+                cell["rowspan"] = rng.randint(1, 3)
+            return cell
+
+        for _i in range(20):
+            data = [
+                [random_cell() for _j in range(rng.randint(0, 12))]
+                for _k in range(rng.randint(1, 30))
+            ]
+            sheet = mock.Mock()
+            self.report.write_dynamic_report(sheet, (row for row in data))
+            expected_sheet = mock.Mock()
+            write_cell_by_cell(expected_sheet, data)
+            self.assertEqual(
+                get_written_cells(sheet), get_written_cells(expected_sheet)
+            )
@@ -13,6 +13,7 @@
         'sale_crm',
     ],
     'data': [
+        'views/crm_lead.xml',
     ],
     'installable': True,
     'application': False,
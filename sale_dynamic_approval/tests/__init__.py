@@ -0,0 +1 @@
+from . import test_sale_order_dynamic_approval
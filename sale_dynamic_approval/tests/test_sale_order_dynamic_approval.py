@@ -0,0 +1,145 @@
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestSaleOrderDynamicApproval(TransactionCase):
+    """Test cases for the approvals of sale orders requested together"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env.company
+        cls.other_company = cls.env['res.company'].create({
+            'name': 'Approval Test Company',
+        })
+        cls.partner = cls.env['res.partner'].create({
+            'name': 'Approval Test Customer',
+        })
+        cls.product = cls.env['product.product'].create({
+            'name': 'Approval Test Product',
+            'list_price': 100,
+        })
+        model_id = cls.env['ir.model']._get_id('sale.order')
+        level_values = [(0, 0, {'sequence': 1, 'user_id': cls.env.user.id})]
+        # big draft orders of the company
+        cls.approval = cls.env['dynamic.approval'].create({
+            'name': 'Approval Test Big Orders',
+            'model_id': model_id,
+            'sequence': 1,
+            'company_id': cls.company.id,
+            'state_from': 'draft',
+            'approval_condition_ids': [(0, 0, {
+                'condition_type': 'domain',
+                'filter_domain': "[('client_order_ref', '=', 'big')]",
+            })],
+            'approval_level_ids': level_values,
+        })
+        # any other draft order
+        cls.shared_approval = cls.env['dynamic.approval'].create({
+            'name': 'Approval Test All Orders',
+            'model_id': model_id,
+            'sequence': 2,
+            'company_id': False,
+            'state_from': 'draft',
+            'approval_level_ids': level_values,
+        })
+        # big sent orders of the other company
+        cls.other_approval = cls.env['dynamic.approval'].create({
+            'name': 'Approval Test Other Company',
+            'model_id': model_id,
+            'sequence': 3,
+            'company_id': cls.other_company.id,
+            'state_from': 'sent',
+            'approval_condition_ids': [(0, 0, {
+                'condition_type': 'python_code',
+                'python_code': "result = record.client_order_ref == 'big'",
+            })],
+            'approval_level_ids': level_values,
+        })
+        cls.orders = cls.env['sale.order']
+        for company, state, ref in [
+            (cls.company, 'draft', 'big'),
+            (cls.company, 'draft', 'small'),
+            (cls.other_company, 'draft', 'big'),
+            (cls.other_company, 'sent', 'big'),
+            (cls.company, 'sent', 'big'),
+            (cls.other_company, 'sent', 'small'),
+        ]:
+            cls.orders |= cls.env['sale.order'].with_company(company).create({
+                'partner_id': cls.partner.id,
+                'company_id': company.id,
+                'client_order_ref': ref,
+                'state': state,
+                'order_line': [(0, 0, {'product_id': cls.product.id, 'product_uom_qty': 1})],
+            })
+
+    def _get_matched_approval_by_record(self, record):
+        """ match the approval of a single record the way it was done before approvals were matched in batch """
+        approvals = self.env['dynamic.approval'].search(
+            [('model', '=', 'sale.order'), '|',
+             ('company_id', '=', record.company_id.id), ('company_id', '=', False),
+             ('state_from', '=', record.state),
+             ], order='sequence ASC')
+        for approval in approvals:
+            if approval.is_matched_approval(record):
+                return approval
+        return approvals.browse()
+
+    def test_01_matched_approvals_by_company_and_state(self):
+        """Test approvals matched for records of several companies and states are the ones matched per record"""
+        matched_approvals = self.env['dynamic.approval']._get_matched_approvals('sale.order', self.orders)
+        expected = {}
+        for record in self.orders:
+            approval = self._get_matched_approval_by_record(record)
+            if approval:
+                expected[record.id] = approval
+        self.assertEqual(matched_approvals, expected)
+        self.assertEqual([matched_approvals.get(record.id) for record in self.orders], [
+            self.approval, self.shared_approval, self.shared_approval, self.other_approval, None, None])
+
+    def test_02_set_approvers_creates_requests_at_once(self):
+        """Test approval requests of all matched records are created with a single create"""
+        Request = self.registry['dynamic.approval.request']
+        with patch.object(Request, 'create', autospec=True, side_effect=Request.create) as create:
+            matched_approvals = self.env['dynamic.approval'].action_set_approvers('sale.order', self.orders)
+        self.assertEqual(create.call_count, 1)
+        requests = self.env['dynamic.approval.request'].search([
+            ('res_model', '=', 'sale.order'), ('res_id', 'in', self.orders.ids)])
+        self.assertEqual(
+            {(request.res_id, request.dynamic_approval_id) for request in requests},
+            {(record_id, approval) for record_id, approval in matched_approvals.items()},
+        )
+        self.assertEqual(set(requests.mapped('status')), {'new'})
+        self.assertEqual(requests.user_id, self.env.user)
+
+    def test_03_request_approval_matched_and_not_matched(self):
+        """Test matched orders are put under approval before the not matched action is returned"""
+        self.shared_approval.approval_level_ids = [(0, 0, {
+            'sequence': 2,
+            'user_id': self.env.user.id,
+            'apply_domain': True,
+            'domain': "[('company_id', '=', %s)]" % self.other_company.id,
+        })]
+        states = self.orders.mapped('state')
+        action = self.orders.action_dynamic_approval_request()
+        self.assertEqual(action['id'], self.env.ref('sale_dynamic_approval.confirm_sale_order_wizard_action').id)
+        matched_orders, not_matched_orders = self.orders[:4], self.orders[4:]
+        self.assertEqual(set(matched_orders.mapped('state')), {'under_approval'})
+        self.assertEqual(matched_orders.mapped('state_from_name'), states[:4])
+        self.assertEqual(matched_orders.mapped('dynamic_approval_id'),
+                         self.approval | self.shared_approval | self.other_approval)
+        self.assertEqual(matched_orders.mapped('approve_requester_id'), self.env.user)
+        self.assertEqual(not_matched_orders.mapped('state'), states[4:])
+        self.assertFalse(not_matched_orders.dynamic_approval_id)
+        requests = self.env['dynamic.approval.request'].search([
+            ('res_model', '=', 'sale.order'), ('res_id', 'in', self.orders.ids)], order='res_id, sequence, id')
+        # the level with a domain only applies to the order of the other company
+        self.assertEqual([(request.res_id, request.sequence, request.status) for request in requests], [
+            (self.orders[0].id, 1, 'pending'),
+            (self.orders[1].id, 1, 'pending'),
+            (self.orders[2].id, 1, 'pending'),
+            (self.orders[2].id, 2, 'new'),
+            (self.orders[3].id, 1, 'pending'),
+        ])